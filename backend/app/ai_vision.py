@@ -3,78 +3,357 @@
 OpenAI Vision API integration for photo analysis
 """
 import os
-import base64
 import io
+import re
+import json
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from typing import Dict, List, Optional
+import httpx
+import numpy as np
 import openai
+import PIL
 from PIL import Image
 import logging
 
+try:
+    import pybase64 as base64  # SIMD-accelerated, same API as the stdlib module
+except ImportError:
+    import base64
+
+try:
+    import orjson  # faster JSON for cached payloads; stdlib json otherwise
+except ImportError:
+    orjson = None
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client
+# Initialize OpenAI clients once so every call reuses the same HTTP/2
+# connection pool instead of paying DNS + TLS setup per request
 openai.api_key = os.getenv("OPENAI_API_KEY")
+OPENAI_HTTP_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=16)
+
+if openai.api_key:
+    openai_client = openai.OpenAI(
+        api_key=openai.api_key,
+        http_client=httpx.Client(http2=True, limits=OPENAI_HTTP_LIMITS)
+    )
+    async_openai_client = openai.AsyncOpenAI(
+        api_key=openai.api_key,
+        http_client=httpx.AsyncClient(http2=True, limits=OPENAI_HTTP_LIMITS)
+    )
+else:
+    openai_client = None
+    async_openai_client = None
+
+# Upload encoding: the vision model re-tiles the image anyway, so a smaller,
+# more compressed JPEG loses nothing for landmark detection
+AI_VISION_MAX_DIMENSION = 768
+AI_VISION_JPEG_QUALITY = int(os.getenv("AI_VISION_JPEG_QUALITY", "75"))
+
+# "low" sends a single 512px pass instead of high-detail tiling, which is
+# enough for landmark identification on an already-downscaled image
+AI_VISION_DETAIL = os.getenv("AI_VISION_DETAIL", "low")
+
+# Bounded worker pool for the CPU-bound resize + JPEG encode, so it runs off
+# the event loop and can overlap other request work
+ENCODE_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="image-encode")
+
+# Pillow-SIMD (versioned "x.y.z.postN") vectorizes LANCZOS; on stock Pillow
+# BILINEAR is several times cheaper and plenty for a downscale sent to the API
+if os.getenv("AI_VISION_RESAMPLE"):
+    AI_VISION_RESAMPLE = Image.Resampling[os.getenv("AI_VISION_RESAMPLE").upper()]
+elif ".post" in PIL.__version__:
+    AI_VISION_RESAMPLE = Image.Resampling.LANCZOS
+else:
+    AI_VISION_RESAMPLE = Image.Resampling.BILINEAR
+
+# Concurrent uploads are analyzed together: requests arriving within the
+# window (up to the batch size) share one Vision API call
+AI_BATCH_WINDOW_SECONDS = float(os.getenv("AI_BATCH_WINDOW_SECONDS", "0.03"))
+AI_BATCH_MAX_SIZE = int(os.getenv("AI_BATCH_MAX_SIZE", "4"))
+
+# Analysis cache keyed by perceptual hash: re-uploads of (nearly) the same
+# photo skip the API call. Shared through Redis when configured, otherwise
+# a small in-process LRU.
+REDIS_URL = os.getenv("REDIS_URL")
+ANALYSIS_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
+LOCAL_ANALYSIS_CACHE_SIZE = 256
+# The prompt carries the user's coordinates as a hint, so they are part of
+# the key, rounded to about 100 m
+ANALYSIS_CACHE_LOCATION_DECIMALS = 3
+
+analysis_cache_redis = aioredis.from_url(REDIS_URL) if aioredis and REDIS_URL else None
+_local_analysis_cache: "OrderedDict[str, str]" = OrderedDict()
+
+# Orthonormal DCT-II basis for the 32x32 perceptual hash
+_PHASH_SIZE = 32
+_PHASH_DCT = np.sqrt(2.0 / _PHASH_SIZE) * np.cos(
+    np.pi * np.outer(np.arange(_PHASH_SIZE), 2 * np.arange(_PHASH_SIZE) + 1) / (2 * _PHASH_SIZE)
+)
+_PHASH_DCT[0] /= np.sqrt(2.0)
+
+# Keyword tables scanned in AI responses
+CHICAGO_KEYWORDS = (
+    "chicago", "loop", "magnificent mile", "lake michigan", 
+    "chi-town", "windy city", "el train", "elevated", "wrigley",
+    "sears tower", "willis tower", "navy pier", "millennium park",
+    "grant park", "lincoln park", "gold coast", "river north"
+)
+
+CHICAGO_LANDMARKS = (
+    "Chicago Theater", "Willis Tower", "Sears Tower", "Navy Pier", 
+    "Millennium Park", "Grant Park", "Wrigley Field", "Union Station",
+    "Art Institute", "Lincoln Park Zoo", "Buckingham Fountain",
+    "Chicago Riverwalk", "Magnificent Mile", "State Street"
+)
+
+# Likelihood contributed by each keyword above (aligned by index); tune
+# individual weights here rather than in the scoring code
+CHICAGO_KEYWORD_WEIGHTS = np.full(len(CHICAGO_KEYWORDS), 0.15, dtype=np.float64)
+
+# Ordered by precedence: the first era found in the text wins
+ERA_KEYWORDS = (
+    ("victorian", 1890),
+    ("art deco", 1930),
+    ("mid-century", 1950),
+    ("modern", 1970),
+    ("contemporary", 1990),
+    ("brutalist", 1970),
+    ("prairie school", 1910),
+    ("chicago school", 1890)
+)
+
+ERA_YEARS = dict(ERA_KEYWORDS)
+
+LANDMARK_COORDINATES = {
+    "Chicago Theater": {"latitude": 41.8781, "longitude": -87.6278},
+    "Willis Tower": {"latitude": 41.8789, "longitude": -87.6359},
+    "Sears Tower": {"latitude": 41.8789, "longitude": -87.6359},
+    "Navy Pier": {"latitude": 41.8917, "longitude": -87.6086},
+    "Millennium Park": {"latitude": 41.8826, "longitude": -87.6226},
+    "Grant Park": {"latitude": 41.8758, "longitude": -87.6189},
+    "Wrigley Field": {"latitude": 41.9484, "longitude": -87.6553},
+    "Union Station": {"latitude": 41.8789, "longitude": -87.6406},
+    "Art Institute": {"latitude": 41.8796, "longitude": -87.6237},
+    "Lincoln Park Zoo": {"latitude": 41.9212, "longitude": -87.6341},
+    "Buckingham Fountain": {"latitude": 41.8758, "longitude": -87.6189},
+    "State Street": {"latitude": 41.8781, "longitude": -87.6278},
+    "Michigan Avenue": {"latitude": 41.8819, "longitude": -87.6278},
+    "Lake Michigan": {"latitude": 41.8900, "longitude": -87.6200},
+    "Chicago Riverwalk": {"latitude": 41.8885, "longitude": -87.6190}
+}
+
+# Landmark coordinates in their final location-record form
+_LANDMARK_LOCATIONS = {
+    name: {
+        **coords,
+        "source": f"landmark_{name}",
+        "accuracy": 200  # Landmark-based has moderate accuracy
+    }
+    for name, coords in LANDMARK_COORDINATES.items()
+}
+
+def _build_keyword_matcher():
+    """Compile all keyword tables into one regex alternation over lowercased ASCII bytes"""
+    patterns: Dict[str, List] = {}
+    for keyword in CHICAGO_KEYWORDS:
+        patterns.setdefault(keyword, []).append(("chicago_keyword", keyword))
+    for landmark in CHICAGO_LANDMARKS:
+        patterns.setdefault(landmark.lower(), []).append(("landmark", landmark))
+    for era_name, _ in ERA_KEYWORDS:
+        patterns.setdefault(era_name, []).append(("era", era_name))
+    
+    # The lookahead reports the longest pattern starting at each position;
+    # any shorter pattern that is a prefix of it matched there as well
+    hits_by_pattern = {
+        pattern.encode('ascii'): tuple(hit for other, hits in patterns.items() if pattern.startswith(other) for hit in hits)
+        for pattern in patterns
+    }
+    alternation = "|".join(re.escape(pattern) for pattern in sorted(patterns, key=len, reverse=True))
+    return re.compile(f"(?=({alternation}))".encode('ascii')), hits_by_pattern
+
+_KEYWORD_RE, _KEYWORD_HITS = _build_keyword_matcher()
+
+# All keywords are ASCII, so a bytes translate is enough to lowercase a
+# response - much cheaper than Unicode case folding on str
+_ASCII_LOWER = bytes.maketrans(b"ABCDEFGHIJKLMNOPQRSTUVWXYZ", b"abcdefghijklmnopqrstuvwxyz")
+
+# Vision prompt; only the location hint between prefix and suffix varies per call.
+# The model answers with a small JSON object, which keeps completions short.
+ANALYSIS_PROMPT_PREFIX = (
+    "Identify where this photo was taken. Look for landmarks, architecture, street signs, "
+    "elevated train tracks, Lake Michigan or the Chicago River."
+)
+
+ANALYSIS_PROMPT_SUFFIX = f"""
+
+Return ONLY a JSON object, no prose, with these fields:
+- "chicago_likelihood": number from 0 to 1
+- "landmarks": array of visible landmarks, using only names from: {", ".join(CHICAGO_LANDMARKS)}
+- "architectural_era": one of {", ".join(era_name for era_name, _ in ERA_KEYWORDS)}, or "unknown"
+- "street_features": array of short phrases
+- "detected_text": array of legible signs or text
+- "summary": one sentence on what identifies the location"""
+
+ANALYSIS_MAX_TOKENS = 200
 
-def encode_image_to_base64(image: Image.Image) -> str:
-    """Convert PIL image to base64 string for OpenAI API"""
+@dataclass(slots=True)
+class GPSFix:
+    """A GPS reading with fixed fields; accuracy is in meters"""
+    latitude: float
+    longitude: float
+    accuracy: float = 1000.0
+    source: str = ""
+    
+    @classmethod
+    def from_dict(cls, gps: Optional[Dict]) -> Optional["GPSFix"]:
+        """Build from a {"latitude", "longitude", ...} dict; None if coordinates are missing"""
+        if not gps or gps.get("latitude") is None or gps.get("longitude") is None:
+            return None
+        accuracy = gps.get("accuracy")
+        return cls(
+            latitude=gps["latitude"],
+            longitude=gps["longitude"],
+            accuracy=1000.0 if accuracy is None else accuracy,
+            source=gps.get("source", "")
+        )
+
+def encode_image_to_data_uri(image: Image.Image, original_bytes: Optional[bytes] = None) -> str:
+    """
+    Convert PIL image to a base64 JPEG data URI for OpenAI API.
+    original_bytes, when given, must be the encoded file the image was opened from.
+    """
+    # Reuse the encoding from a previous call on the same (unchanged) image
+    cached = getattr(image, "_data_uri_cache", None)
+    if cached and cached[0] == (image.size, image.mode):
+        return cached[1]
+    
+    source = image
+    
+    # A small RGB JPEG is already what we would produce - send the original file
+    if (original_bytes is not None and image.format == 'JPEG' and image.mode == 'RGB'
+            and max(image.size) <= AI_VISION_MAX_DIMENSION):
+        data_uri = "data:image/jpeg;base64," + base64.b64encode(original_bytes).decode('ascii')
+        source._data_uri_cache = ((source.size, source.mode), data_uri)
+        return data_uri
+    
     # Resize image if too large (OpenAI has size limits)
-    if image.size[0] > 1024 or image.size[1] > 1024:
-        image.thumbnail((1024, 1024), Image.Resampling.LANCZOS)
+    if image.size[0] > AI_VISION_MAX_DIMENSION or image.size[1] > AI_VISION_MAX_DIMENSION:
+        image.thumbnail((AI_VISION_MAX_DIMENSION, AI_VISION_MAX_DIMENSION), AI_VISION_RESAMPLE)
     
     # Convert to RGB if needed
     if image.mode != 'RGB':
         image = image.convert('RGB')
     
-    # Save to bytes
-    buffer = io.BytesIO()
-    image.save(buffer, format='JPEG', quality=85)
-    img_bytes = buffer.getvalue()
+    # Save to bytes (buffer released on exit)
+    with io.BytesIO() as buffer:
+        image.save(buffer, format='JPEG', quality=AI_VISION_JPEG_QUALITY, optimize=True, progressive=True)
+        img_bytes = buffer.getvalue()
+    
+    # Encode straight into the data URI so callers don't build a second copy
+    data_uri = "data:image/jpeg;base64," + base64.b64encode(img_bytes).decode('ascii')
+    
+    # PIL images are unhashable, so the cache lives on the instance itself
+    source._data_uri_cache = ((source.size, source.mode), data_uri)
+    return data_uri
+
+def perceptual_hash(image: Image.Image) -> str:
+    """64-bit DCT perceptual hash (pHash) as 16 hex digits"""
+    small = image.convert("L").resize((_PHASH_SIZE, _PHASH_SIZE), Image.Resampling.BILINEAR)
+    pixels = np.asarray(small, dtype=np.float64)
+    # Keep the 8x8 lowest frequencies, threshold against their median
+    low_freq = (_PHASH_DCT @ pixels @ _PHASH_DCT.T)[:8, :8].ravel()
+    bits = low_freq > np.median(low_freq)
+    return f"{int.from_bytes(np.packbits(bits).tobytes(), 'big'):016x}"
+
+def analysis_cache_key(image: Image.Image, user_location: Optional[Dict] = None) -> str:
+    """Cache key for an analysis: the image's perceptual hash plus the rounded location hint, if any"""
+    location = "none"
+    if user_location and user_location.get("latitude") is not None and user_location.get("longitude") is not None:
+        location = (
+            f"{round(user_location['latitude'], ANALYSIS_CACHE_LOCATION_DECIMALS)},"
+            f"{round(user_location['longitude'], ANALYSIS_CACHE_LOCATION_DECIMALS)}"
+        )
+    return f"ai_vision:analysis:{perceptual_hash(image)}:{location}"
+
+async def get_cached_analysis(key: str) -> Optional[Dict]:
+    """Look up a cached analysis; cache failures count as misses"""
+    try:
+        if analysis_cache_redis is not None:
+            cached = await analysis_cache_redis.get(key)
+        else:
+            cached = _local_analysis_cache.get(key)
+            if cached is not None:
+                _local_analysis_cache.move_to_end(key)
+    except Exception as e:
+        logger.warning(f"Analysis cache read failed: {e}")
+        return None
+    return (orjson or json).loads(cached) if cached else None
+
+async def store_cached_analysis(key: str, analysis: Dict):
+    """Store an analysis as JSON (so every hit returns a fresh copy)"""
+    payload = orjson.dumps(analysis) if orjson else json.dumps(analysis)
+    try:
+        if analysis_cache_redis is not None:
+            await analysis_cache_redis.set(key, payload, ex=ANALYSIS_CACHE_TTL_SECONDS)
+        else:
+            _local_analysis_cache[key] = payload
+            _local_analysis_cache.move_to_end(key)
+            while len(_local_analysis_cache) > LOCAL_ANALYSIS_CACHE_SIZE:
+                _local_analysis_cache.popitem(last=False)
+    except Exception as e:
+        logger.warning(f"Analysis cache write failed: {e}")
+
+def build_analysis_prompt(user_location: Optional[Dict] = None) -> str:
+    """Build the location-analysis prompt, optionally hinting the user's coordinates"""
+    location_hint = ""
+    if user_location:
+        location_hint = f" The photo was taken near coordinates {user_location.get('latitude')}, {user_location.get('longitude')}."
     
-    # Encode to base64
-    return base64.b64encode(img_bytes).decode('utf-8')
+    return "".join((ANALYSIS_PROMPT_PREFIX, location_hint, ANALYSIS_PROMPT_SUFFIX))
 
-def analyze_photo_with_ai(image: Image.Image, user_location: Optional[Dict] = None) -> Dict:
+async def analyze_photo_with_ai(image: Image.Image, user_location: Optional[Dict] = None,
+                                image_bytes: Optional[bytes] = None,
+                                image_data_uri: Optional[str] = None,
+                                cache_key: Optional[str] = None) -> Dict:
     """
-    Use OpenAI Vision to analyze the photo and extract location/landmark information
+    Use OpenAI Vision to analyze the photo and extract location/landmark information.
+    Pass image_data_uri when the image has already been encoded, and cache_key
+    when it was computed before encoding (encoding downscales the image).
     """
-    if not openai.api_key:
+    if not async_openai_client:
         logger.warning("OpenAI API key not configured - using fallback analysis")
         return fallback_analysis(image)
     
     try:
-        # Encode image
-        base64_image = encode_image_to_base64(image)
+        # Reuse a previous analysis of the same image if any, before encoding
+        loop = asyncio.get_running_loop()
+        if cache_key is None:
+            cache_key = await loop.run_in_executor(ENCODE_POOL, analysis_cache_key, image, user_location)
+        cached_analysis = await get_cached_analysis(cache_key)
+        if cached_analysis is not None:
+            logger.info("OpenAI Vision analysis served from cache")
+            return cached_analysis
         
-        # Create the prompt
-        location_hint = ""
-        if user_location:
-            location_hint = f" The photo was taken near coordinates {user_location.get('latitude')}, {user_location.get('longitude')}."
+        # Encode image off the event loop (resize + JPEG encode is CPU-bound)
+        if image_data_uri is None:
+            image_data_uri = await loop.run_in_executor(
+                ENCODE_POOL, encode_image_to_data_uri, image, image_bytes
+            )
         
-        prompt = f"""Analyze this photo and help identify the location. Please provide:
-
-1. **Location Analysis**: What city/area does this appear to be? Look for architectural styles, street signs, landmarks, or other identifying features.
-
-2. **Landmarks**: What specific buildings, monuments, or notable structures can you see?
-
-3. **Street Features**: Describe the street layout, intersections, or distinctive urban features.
-
-4. **Time Period Clues**: Based on architecture, vehicles, clothing, or other visible elements, what time period might this represent?
-
-5. **Geographic Clues**: Any signs, license plates, or other text that might indicate location?
-
-6. **Chicago-Specific**: Does anything in this photo suggest it could be Chicago? Look for:
-   - Elevated train tracks or stations
-   - Chicago-style architecture (brick buildings, fire escapes)
-   - Lake Michigan or Chicago River
-   - Recognizable Chicago landmarks
-   - Chicago street grid system
-
-{location_hint}
-
-Format your response as a JSON-like structure with clear categories. Be specific about what you can see versus what you're inferring."""
+        # Create the prompt
+        prompt = build_analysis_prompt(user_location)
 
         # Call OpenAI Vision API
-        response = openai.chat.completions.create(
+        response = await async_openai_client.chat.completions.create(
             model="gpt-4-vision-preview",
             messages=[
                 {
@@ -87,14 +366,14 @@ Format your response as a JSON-like structure with clear categories. Be specific
                         {
                             "type": "image_url",
                             "image_url": {
-                                "url": f"data:image/jpeg;base64,{base64_image}",
-                                "detail": "high"
+                                "url": image_data_uri,
+                                "detail": AI_VISION_DETAIL
                             }
                         }
                     ]
                 }
             ],
-            max_tokens=1000,
+            max_tokens=ANALYSIS_MAX_TOKENS,
             temperature=0.3
         )
         
@@ -102,6 +381,7 @@ Format your response as a JSON-like structure with clear categories. Be specific
         
         # Parse the AI response into structured data
         parsed_analysis = parse_ai_analysis(ai_analysis)
+        await store_cached_analysis(cache_key, parsed_analysis)
         
         logger.info(f"OpenAI Vision analysis completed: {len(ai_analysis)} characters")
         return parsed_analysis
@@ -110,11 +390,210 @@ Format your response as a JSON-like structure with clear categories. Be specific
         logger.error(f"OpenAI Vision analysis failed: {e}")
         return fallback_analysis(image)
 
+async def analyze_photos_with_ai(images: List[Image.Image], user_location: Optional[Dict] = None,
+                                 image_data_uris: Optional[List[Optional[str]]] = None,
+                                 user_locations: Optional[List[Optional[Dict]]] = None,
+                                 cache_keys: Optional[List[Optional[str]]] = None) -> List[Dict]:
+    """
+    Analyze several photos in a single OpenAI Vision request.
+    Returns one analysis per image, in order. Cached analyses are reused and
+    only the other photos are sent; photos the response doesn't cover fall
+    back to the basic analysis. user_locations gives each photo its own
+    location hint instead of the shared user_location; cache_keys holds keys
+    already computed for any of the images.
+    """
+    if not images:
+        return []
+    image_data_uris = list(image_data_uris or [None] * len(images))
+    cache_keys = list(cache_keys or [None] * len(images))
+    if len(images) == 1:
+        location = user_locations[0] if user_locations else user_location
+        return [await analyze_photo_with_ai(
+            images[0], location, image_data_uri=image_data_uris[0], cache_key=cache_keys[0]
+        )]
+    
+    if not async_openai_client:
+        logger.warning("OpenAI API key not configured - using fallback analysis")
+        return [fallback_analysis(image) for image in images]
+    
+    try:
+        loop = asyncio.get_running_loop()
+        unkeyed = [i for i, key in enumerate(cache_keys) if key is None]
+        keys = await asyncio.gather(*(
+            loop.run_in_executor(
+                ENCODE_POOL, analysis_cache_key, images[i], user_locations[i] if user_locations else user_location
+            )
+            for i in unkeyed
+        ))
+        for i, key in zip(unkeyed, keys):
+            cache_keys[i] = key
+        results = list(await asyncio.gather(*(get_cached_analysis(key) for key in cache_keys)))
+        pending = [i for i, result in enumerate(results) if result is None]
+        if len(pending) < len(images):
+            logger.info(f"OpenAI Vision analysis served from cache for {len(images) - len(pending)} photos")
+        if not pending:
+            return results
+        
+        prompt = (
+            f"You will receive {len(pending)} photos. For each photo write a line '### Photo <n>' "
+            f"(<n> is the photo number) followed by its JSON object as described below.\n\n"
+            + build_analysis_prompt(None if user_locations else user_location)
+        )
+        
+        # Encode the photos not already encoded, concurrently in worker threads
+        unencoded = [i for i in pending if not image_data_uris[i]]
+        encoded = await asyncio.gather(
+            *(loop.run_in_executor(ENCODE_POOL, encode_image_to_data_uri, images[i]) for i in unencoded)
+        )
+        for i, data_uri in zip(unencoded, encoded):
+            image_data_uris[i] = data_uri
+        data_uris = [image_data_uris[i] for i in pending]
+        
+        # One text part, then each image preceded by its label
+        content = [{"type": "text", "text": prompt}]
+        for n, (i, data_uri) in enumerate(zip(pending, data_uris), start=1):
+            label = f"Photo {n}:"
+            location = user_locations[i] if user_locations else None
+            if location:
+                label = f"Photo {n} (taken near coordinates {location.get('latitude')}, {location.get('longitude')}):"
+            content.append({"type": "text", "text": label})
+            content.append({
+                "type": "image_url",
+                "image_url": {
+                    "url": data_uri,
+                    "detail": AI_VISION_DETAIL
+                }
+            })
+        
+        response = await async_openai_client.chat.completions.create(
+            model="gpt-4-vision-preview",
+            messages=[{"role": "user", "content": content}],
+            max_tokens=ANALYSIS_MAX_TOKENS * len(pending),
+            temperature=0.3
+        )
+        
+        ai_analysis = response.choices[0].message.content
+        
+        # Split the combined answer on the "### Photo <n>" sentinels
+        sections = {}
+        parts = re.split(r"^#+\s*Photo\s+(\d+)\s*:?\s*$", ai_analysis, flags=re.MULTILINE)
+        for number, section in zip(parts[1::2], parts[2::2]):
+            sections[int(number)] = section.strip()
+        
+        logger.info(f"OpenAI Vision batch analysis completed: {len(pending)} photos, {len(ai_analysis)} characters")
+        for n, i in enumerate(pending, start=1):
+            if sections.get(n):
+                results[i] = parse_ai_analysis(sections[n])
+                await store_cached_analysis(cache_keys[i], results[i])
+            else:
+                results[i] = fallback_analysis(images[i])
+        return results
+        
+    except Exception as e:
+        logger.error(f"OpenAI Vision batch analysis failed: {e}")
+        return [fallback_analysis(image) for image in images]
+
+class BatchedAnalyzer:
+    """
+    Micro-batcher for per-request photo analysis. Requests are queued; a
+    background task collects those arriving within window_seconds of the
+    first (up to max_size) and analyzes them with one Vision API call.
+    Until start() is called, or without an OpenAI key, photos are analyzed
+    directly.
+    """
+    
+    def __init__(self, window_seconds: float = AI_BATCH_WINDOW_SECONDS, max_size: int = AI_BATCH_MAX_SIZE):
+        self.window_seconds = window_seconds
+        self.max_size = max_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._batches: set = set()
+    
+    def start(self):
+        """Start collecting batches on the running event loop"""
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._collect())
+    
+    async def stop(self):
+        """
+        Stop collecting: the batch being collected is sent as is, queued
+        requests fall back to direct analysis, and all of them are awaited
+        """
+        if self._task is not None:
+            task, self._task = self._task, None  # new requests go direct from here
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            while not self._queue.empty():
+                self._dispatch([self._queue.get_nowait()])
+        if self._batches:
+            await asyncio.gather(*self._batches, return_exceptions=True)
+    
+    async def analyze(self, image: Image.Image, user_location: Optional[Dict] = None,
+                      image_bytes: Optional[bytes] = None, image_data_uri: Optional[str] = None,
+                      cache_key: Optional[str] = None) -> Dict:
+        """Analyze one photo, sharing an API call with concurrent requests"""
+        if self._task is None or not async_openai_client:
+            return await analyze_photo_with_ai(image, user_location, image_bytes, image_data_uri, cache_key)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((image, user_location, image_data_uri, cache_key, future))
+        return await future
+    
+    async def _collect(self):
+        """Gather requests into batches; each batch is analyzed in its own task"""
+        loop = asyncio.get_running_loop()
+        batch = []
+        try:
+            while True:
+                batch = [await self._queue.get()]
+                deadline = loop.time() + self.window_seconds
+                while len(batch) < self.max_size:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+                
+                self._dispatch(batch)
+                batch = []
+        except asyncio.CancelledError:
+            # Requests already taken off the queue still need their answer
+            if batch:
+                self._dispatch(batch)
+            raise
+    
+    def _dispatch(self, batch: List[tuple]):
+        """Analyze a batch in its own task, tracked until it finishes"""
+        task = asyncio.create_task(self._analyze_batch(batch))
+        self._batches.add(task)
+        task.add_done_callback(self._batches.discard)
+    
+    async def _analyze_batch(self, batch: List[tuple]):
+        """Run one batched analysis and hand each request its result"""
+        images, locations, data_uris, keys, futures = zip(*batch)
+        try:
+            results = await analyze_photos_with_ai(
+                list(images), image_data_uris=list(data_uris), user_locations=list(locations),
+                cache_keys=list(keys)
+            )
+        except Exception as e:
+            logger.error(f"Batched photo analysis failed: {e}")
+            results = [fallback_analysis(image) for image in images]
+        for future, result in zip(futures, results):
+            if not future.done():
+                future.set_result(result)
+
+vision_batcher = BatchedAnalyzer()
+
 def parse_ai_analysis(ai_text: str) -> Dict:
     """
     Parse the AI analysis text into structured data
     """
-    # This is a simplified parser - in production, you might want more sophisticated parsing
     analysis = {
         "landmarks": [],
         "location_confidence": 0.5,
@@ -126,55 +605,88 @@ def parse_ai_analysis(ai_text: str) -> Dict:
         "geographic_clues": []
     }
     
-    text_lower = ai_text.lower()
+    structured = _load_json_object(ai_text)
+    if structured is not None:
+        return _apply_structured_analysis(analysis, structured)
     
-    # Look for Chicago-specific mentions
-    chicago_keywords = [
-        "chicago", "loop", "magnificent mile", "lake michigan", 
-        "chi-town", "windy city", "el train", "elevated", "wrigley",
-        "sears tower", "willis tower", "navy pier", "millennium park",
-        "grant park", "lincoln park", "gold coast", "river north"
-    ]
+    # Free-text answer: fall back to scanning for known keywords
+    # Non-ASCII characters become '?' so they can't join neighbouring words
+    text_lower = ai_text.encode('ascii', 'replace').translate(_ASCII_LOWER)
     
-    chicago_mentions = sum(1 for keyword in chicago_keywords if keyword in text_lower)
-    analysis["chicago_likelihood"] = min(0.9, 0.3 + (chicago_mentions * 0.15))
+    # Single pass over the text collects hits for every keyword table
+    found = {"chicago_keyword": set(), "landmark": set(), "era": set()}
+    for match in _KEYWORD_RE.finditer(text_lower):
+        for category, value in _KEYWORD_HITS[match.group(1)]:
+            found[category].add(value)
+    
+    # Look for Chicago-specific mentions
+    chicago_mentions = len(found["chicago_keyword"])
+    keyword_hits = np.fromiter(
+        (keyword in found["chicago_keyword"] for keyword in CHICAGO_KEYWORDS),
+        dtype=np.float64, count=len(CHICAGO_KEYWORDS)
+    )
+    analysis["chicago_likelihood"] = min(0.9, 0.3 + float(keyword_hits @ CHICAGO_KEYWORD_WEIGHTS))
     
     # Extract landmarks mentioned in the text
-    chicago_landmarks = [
-        "Chicago Theater", "Willis Tower", "Sears Tower", "Navy Pier", 
-        "Millennium Park", "Grant Park", "Wrigley Field", "Union Station",
-        "Art Institute", "Lincoln Park Zoo", "Buckingham Fountain",
-        "Chicago Riverwalk", "Magnificent Mile", "State Street"
-    ]
+    analysis["landmarks"] = [landmark for landmark in CHICAGO_LANDMARKS if landmark in found["landmark"]]
     
-    for landmark in chicago_landmarks:
-        if landmark.lower() in text_lower:
-            analysis["landmarks"].append(landmark)
+    # Nothing ties the photo to Chicago - era and confidence stay at defaults
+    if not chicago_mentions and not analysis["landmarks"]:
+        return analysis
     
     # Detect architectural era mentions
-    era_keywords = {
-        "victorian": 1890,
-        "art deco": 1930, 
-        "mid-century": 1950,
-        "modern": 1970,
-        "contemporary": 1990,
-        "brutalist": 1970,
-        "prairie school": 1910,
-        "chicago school": 1890
-    }
-    
-    for era_name, year in era_keywords.items():
-        if era_name in text_lower:
+    for era_name, year in ERA_KEYWORDS:
+        if era_name in found["era"]:
             analysis["architectural_era"] = era_name
             analysis["estimated_era_year"] = year
             break
     
     # Set confidence based on specificity
-    if analysis["landmarks"] or "chicago" in text_lower:
+    if analysis["landmarks"] or "chicago" in found["chicago_keyword"]:
         analysis["location_confidence"] = min(0.9, 0.6 + len(analysis["landmarks"]) * 0.1)
     
     return analysis
 
+def _load_json_object(ai_text: str) -> Optional[Dict]:
+    """Extract the JSON object from a model answer (possibly wrapped in a code fence)"""
+    start = ai_text.find("{")
+    end = ai_text.rfind("}")
+    if start == -1 or end < start:
+        return None
+    try:
+        data = json.loads(ai_text[start:end + 1])
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+def _apply_structured_analysis(analysis: Dict, data: Dict) -> Dict:
+    """Fill the analysis from the JSON fields requested by the prompt"""
+    try:
+        likelihood = float(data.get("chicago_likelihood", 0.5))
+    except (TypeError, ValueError):
+        likelihood = 0.5
+    analysis["chicago_likelihood"] = min(0.9, max(0.0, likelihood))
+    
+    # Only keep landmarks we know, in canonical spelling
+    reported = {str(landmark).lower() for landmark in data.get("landmarks") or []}
+    analysis["landmarks"] = [landmark for landmark in CHICAGO_LANDMARKS if landmark.lower() in reported]
+    analysis["street_features"] = [str(feature) for feature in data.get("street_features") or []]
+    analysis["detected_text"] = [str(text) for text in data.get("detected_text") or []]
+    if data.get("summary"):
+        analysis["ai_raw_analysis"] = str(data["summary"])
+    
+    # Nothing ties the photo to Chicago - era and confidence stay at defaults
+    if analysis["chicago_likelihood"] <= 0.3 and not analysis["landmarks"]:
+        return analysis
+    
+    era_name = str(data.get("architectural_era", "")).lower()
+    if era_name in ERA_YEARS:
+        analysis["architectural_era"] = era_name
+        analysis["estimated_era_year"] = ERA_YEARS[era_name]
+    
+    analysis["location_confidence"] = min(0.9, 0.6 + len(analysis["landmarks"]) * 0.1)
+    return analysis
+
 def fallback_analysis(image: Image.Image) -> Dict:
     """
     Fallback analysis when OpenAI Vision is not available
@@ -191,23 +703,35 @@ def fallback_analysis(image: Image.Image) -> Dict:
         "fallback_mode": True
     }
 
-def enhance_location_detection(image: Image.Image, exif_gps: Optional[Dict], user_gps: Optional[Dict]) -> Dict:
+async def enhance_location_detection(image: Image.Image, exif_gps: Optional[Dict], user_gps: Optional[Dict],
+                                     image_bytes: Optional[bytes] = None) -> Dict:
     """
     Combine AI analysis with GPS data to improve location detection
     """
-    # Get AI analysis
-    ai_analysis = analyze_photo_with_ai(image, user_gps or exif_gps)
+    # Check the analysis cache first; only on a miss start encoding, so it
+    # overlaps the GPS merge below
+    ai_location = user_gps or exif_gps
+    ai_analysis = None
+    cache_key = None
+    encode_future = None
+    if async_openai_client:
+        loop = asyncio.get_running_loop()
+        cache_key = await loop.run_in_executor(ENCODE_POOL, analysis_cache_key, image, ai_location)
+        ai_analysis = await get_cached_analysis(cache_key)
+        if ai_analysis is None:
+            encode_future = loop.run_in_executor(ENCODE_POOL, encode_image_to_data_uri, image, image_bytes)
     
     # Combine with GPS data
     location_data = {
-        "ai_analysis": ai_analysis,
+        "ai_analysis": None,
         "gps_sources": {},
         "final_location": None,
         "confidence_score": 0.3
     }
     
     # Prioritize GPS sources
-    if user_gps and user_gps.get("accuracy", 1000) < 100:
+    user_fix = GPSFix.from_dict(user_gps)
+    if user_fix and user_fix.accuracy < 100:
         location_data["gps_sources"]["user_gps"] = user_gps
         location_data["final_location"] = user_gps
         location_data["confidence_score"] += 0.4
@@ -217,15 +741,29 @@ def enhance_location_detection(image: Image.Image, exif_gps: Optional[Dict], use
         location_data["final_location"] = exif_gps
         location_data["confidence_score"] += 0.3
     
+    # Get AI analysis
+    if ai_analysis is None:
+        image_data_uri = None
+        if encode_future is not None:
+            try:
+                image_data_uri = await encode_future
+            except Exception as e:
+                logger.error(f"Image encoding failed: {e}")
+        ai_analysis = await vision_batcher.analyze(image, ai_location, image_bytes, image_data_uri, cache_key)
+    else:
+        logger.info("OpenAI Vision analysis served from cache")
+    location_data["ai_analysis"] = ai_analysis
+    
     # AI analysis boosts confidence if it suggests Chicago
-    if ai_analysis.get("chicago_likelihood", 0) > 0.6:
+    chicago_likelihood = ai_analysis.get("chicago_likelihood", 0)
+    if chicago_likelihood > 0.6:
         location_data["confidence_score"] += 0.2
     
     if ai_analysis.get("landmarks"):
         location_data["confidence_score"] += 0.1
     
     # If no GPS but AI is confident about Chicago, use downtown coordinates
-    if not location_data["final_location"] and ai_analysis.get("chicago_likelihood", 0) > 0.7:
+    if not location_data["final_location"] and chicago_likelihood > 0.7:
         location_data["final_location"] = {
             "latitude": 41.8781,
             "longitude": -87.6278,
@@ -242,29 +780,9 @@ def suggest_chicago_coordinates_from_landmarks(landmarks: List[str]) -> Optional
     """
     Map landmark names to specific GPS coordinates
     """
-    landmark_coordinates = {
-        "Chicago Theater": {"latitude": 41.8781, "longitude": -87.6278},
-        "Willis Tower": {"latitude": 41.8789, "longitude": -87.6359},
-        "Sears Tower": {"latitude": 41.8789, "longitude": -87.6359},
-        "Navy Pier": {"latitude": 41.8917, "longitude": -87.6086},
-        "Millennium Park": {"latitude": 41.8826, "longitude": -87.6226},
-        "Grant Park": {"latitude": 41.8758, "longitude": -87.6189},
-        "Wrigley Field": {"latitude": 41.9484, "longitude": -87.6553},
-        "Union Station": {"latitude": 41.8789, "longitude": -87.6406},
-        "Art Institute": {"latitude": 41.8796, "longitude": -87.6237},
-        "Lincoln Park Zoo": {"latitude": 41.9212, "longitude": -87.6341},
-        "Buckingham Fountain": {"latitude": 41.8758, "longitude": -87.6189},
-        "State Street": {"latitude": 41.8781, "longitude": -87.6278},
-        "Michigan Avenue": {"latitude": 41.8819, "longitude": -87.6278},
-        "Lake Michigan": {"latitude": 41.8900, "longitude": -87.6200},
-        "Chicago Riverwalk": {"latitude": 41.8885, "longitude": -87.6190}
-    }
-    
     for landmark in landmarks:
-        if landmark in landmark_coordinates:
-            coords = landmark_coordinates[landmark].copy()
-            coords["source"] = f"landmark_{landmark}"
-            coords["accuracy"] = 200  # Landmark-based has moderate accuracy
-            return coords
+        location = _LANDMARK_LOCATIONS.get(landmark)
+        if location:
+            return location.copy()
     
     return None
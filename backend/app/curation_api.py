@@ -2,32 +2,267 @@
 """
 API endpoints for managing auto-curation system
 """
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from sqlalchemy.orm import Session
-from typing import List, Dict
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query
+from fastapi.encoders import jsonable_encoder
+from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.cron import CronTrigger
+from sqlalchemy import func, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import BaseModel, BeforeValidator, ConfigDict, Field, computed_field
+from typing import Annotated, Any, List, Dict, Optional
 from datetime import datetime, timedelta
+import asyncio
+import json
 import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
 
-from database import get_db, HistoricalPhoto, CurationLog, PhotoQualityFeedback
-from photo_curator import AIPhotoCurator, schedule_curation_cycles
-import json
+from database import engine, AsyncSessionLocal, get_async_db, HistoricalPhoto, CurationLog, PhotoQualityFeedback
+from photo_curator import AIPhotoCurator
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
+try:
+    import orjson  # faster JSON for cached payloads; stdlib json otherwise
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+# Short-lived cache for the aggregate endpoints; their data only changes when
+# a curation cycle finishes, which clears it. Without Redis each process
+# keeps its own copy.
+REDIS_URL = os.getenv("REDIS_URL")
+STATS_CACHE_TTL_SECONDS = 60
+STATS_CACHE_PREFIX = "stm:curation:"
+LOCAL_STATS_CACHE_SIZE = 256
+
+stats_cache_redis = aioredis.from_url(REDIS_URL) if aioredis and REDIS_URL else None
+_local_stats_cache: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, payload), oldest first
+
+async def get_cached_stats(key: str) -> Optional[Dict]:
+    """Look up a cached endpoint response; cache failures count as misses"""
+    key = STATS_CACHE_PREFIX + key
+    try:
+        if stats_cache_redis is not None:
+            cached = await stats_cache_redis.get(key)
+        else:
+            expires_at, cached = _local_stats_cache.get(key, (0, None))
+            if expires_at < time.monotonic():
+                _local_stats_cache.pop(key, None)
+                cached = None
+    except Exception as e:
+        logger.warning(f"Stats cache read failed: {e}")
+        return None
+    return (orjson or json).loads(cached) if cached else None
+
+async def store_cached_stats(key: str, response: Dict):
+    """Cache an endpoint response as JSON for STATS_CACHE_TTL_SECONDS"""
+    key = STATS_CACHE_PREFIX + key
+    response = jsonable_encoder(response)
+    payload = orjson.dumps(response) if orjson else json.dumps(response)
+    try:
+        if stats_cache_redis is not None:
+            await stats_cache_redis.set(key, payload, ex=STATS_CACHE_TTL_SECONDS)
+        else:
+            # Keys include query parameters, so keep the most recent entries only
+            _local_stats_cache[key] = (time.monotonic() + STATS_CACHE_TTL_SECONDS, payload)
+            _local_stats_cache.move_to_end(key)
+            while len(_local_stats_cache) > LOCAL_STATS_CACHE_SIZE:
+                _local_stats_cache.popitem(last=False)
+    except Exception as e:
+        logger.warning(f"Stats cache write failed: {e}")
+
+async def clear_cached_stats():
+    """Drop every cached endpoint response"""
+    try:
+        if stats_cache_redis is not None:
+            keys = [key async for key in stats_cache_redis.scan_iter(match=STATS_CACHE_PREFIX + "*")]
+            if keys:
+                await stats_cache_redis.delete(*keys)
+        else:
+            _local_stats_cache.clear()
+    except Exception as e:
+        logger.warning(f"Stats cache clear failed: {e}")
+
+# Reported by /status; read once since the environment doesn't change at runtime
+OPENAI_CONFIGURED = bool(os.getenv("OPENAI_API_KEY"))
+FLICKR_CONFIGURED = bool(os.getenv("FLICKR_API_KEY"))
+
 curation_router = APIRouter(prefix="/curation", tags=["Auto-Curation"])
 
+# Daily curation runs as a cron job; the job and its paused/enabled state are
+# kept in the database so they survive restarts
+DAILY_CURATION_JOB_ID = "daily_curation"
+DAILY_CURATION_HOUR_UTC = int(os.getenv("DAILY_CURATION_HOUR_UTC", "3"))
+DEFAULT_DAILY_CURATION_PHOTOS = 50
+
+# Every uvicorn worker starts a scheduler on the shared job store. With
+# several workers, set this to false on all but one: the others can still
+# enable/disable the job, but never run it themselves.
+CURATION_SCHEDULER_RUN_JOBS = os.getenv("CURATION_SCHEDULER_RUN_JOBS", "true").lower() == "true"
+
+# Curators with a cycle in progress, so app shutdown can stop them early
+running_curators: set = set()
+
+curation_scheduler = AsyncIOScheduler(
+    jobstores={"default": SQLAlchemyJobStore(engine=engine)},
+    timezone="UTC"
+)
+
+# Columns the list endpoints serialize; selecting just these returns plain
+# rows instead of full ORM entities
+LOG_LIST_COLUMNS = (
+    CurationLog.id,
+    CurationLog.cycle_date,
+    CurationLog.photos_discovered,
+    CurationLog.photos_processed,
+    CurationLog.photos_approved,
+    CurationLog.photos_stored,
+    CurationLog.duration_seconds,
+    CurationLog.success_rate,
+    CurationLog.library_of_congress_count,
+    CurationLog.flickr_count,
+    CurationLog.wikimedia_count,
+    CurationLog.unsplash_count,
+    CurationLog.avg_chicago_relevance,
+    CurationLog.avg_image_quality,
+    CurationLog.avg_historical_value,
+    CurationLog.error_count,
+)
+
+RECENT_PHOTO_COLUMNS = (
+    HistoricalPhoto.id,
+    HistoricalPhoto.filename,
+    HistoricalPhoto.title,
+    HistoricalPhoto.year,
+    HistoricalPhoto.source,
+    HistoricalPhoto.source_url,
+    HistoricalPhoto.curation_date,
+    HistoricalPhoto.latitude,
+    HistoricalPhoto.longitude,
+    HistoricalPhoto.location_accuracy,
+    HistoricalPhoto.landmarks,
+    HistoricalPhoto.image_quality_score,
+    HistoricalPhoto.historical_interest_score,
+    HistoricalPhoto.ai_analysis_data,
+    HistoricalPhoto.approved_by_ai,
+    HistoricalPhoto.manual_review_needed,
+)
+
+# Response models, validated straight from the selected rows
+def _rounded(digits: int) -> BeforeValidator:
+    """Round a nullable number, treating NULL as 0"""
+    return BeforeValidator(lambda value: round(value or 0, digits))
+
+class CurationLogOut(BaseModel):
+    """One curation cycle in /curation/logs"""
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: Annotated[str, BeforeValidator(str)]
+    cycle_date: datetime
+    photos_discovered: Optional[int]
+    photos_processed: Optional[int]
+    photos_approved: Optional[int]
+    photos_stored: Optional[int]
+    duration_seconds: Optional[float]
+    success_rate: Annotated[float, _rounded(2)]
+    error_count: Optional[int]
+    library_of_congress_count: Optional[int] = Field(exclude=True)
+    flickr_count: Optional[int] = Field(exclude=True)
+    wikimedia_count: Optional[int] = Field(exclude=True)
+    unsplash_count: Optional[int] = Field(exclude=True)
+    avg_chicago_relevance: Annotated[float, _rounded(1)] = Field(exclude=True)
+    avg_image_quality: Annotated[float, _rounded(1)] = Field(exclude=True)
+    avg_historical_value: Annotated[float, _rounded(1)] = Field(exclude=True)
+    
+    @computed_field
+    @property
+    def sources(self) -> Dict[str, Optional[int]]:
+        return {
+            "library_of_congress": self.library_of_congress_count,
+            "flickr": self.flickr_count,
+            "wikimedia": self.wikimedia_count,
+            "unsplash": self.unsplash_count
+        }
+    
+    @computed_field
+    @property
+    def quality_metrics(self) -> Dict[str, float]:
+        return {
+            "avg_chicago_relevance": self.avg_chicago_relevance,
+            "avg_image_quality": self.avg_image_quality,
+            "avg_historical_value": self.avg_historical_value
+        }
+
+class CurationLogList(BaseModel):
+    logs: List[CurationLogOut]
+    # pass back as ?cursor=&cursor_id= for the next page
+    next_cursor: Optional[datetime] = None
+    next_cursor_id: Optional[str] = None
+
+class RecentPhotoOut(BaseModel):
+    """One auto-curated photo in /curation/photos/recent"""
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: Annotated[str, BeforeValidator(str)]
+    filename: str
+    title: Optional[str]
+    year: int
+    source: Optional[str]
+    source_url: Optional[str]
+    curation_date: Optional[datetime]
+    landmarks: Annotated[List[str], BeforeValidator(lambda value: value or [])]
+    ai_approved: Optional[bool] = Field(validation_alias="approved_by_ai")
+    needs_review: Optional[bool] = Field(validation_alias="manual_review_needed")
+    latitude: float = Field(exclude=True)
+    longitude: float = Field(exclude=True)
+    location_accuracy: Optional[int] = Field(exclude=True)
+    image_quality_score: Optional[float] = Field(exclude=True)
+    historical_interest_score: Optional[float] = Field(exclude=True)
+    ai_analysis_data: Optional[Dict[str, Any]] = Field(exclude=True)
+    
+    @computed_field
+    @property
+    def location(self) -> Dict[str, Any]:
+        return {
+            "latitude": self.latitude,
+            "longitude": self.longitude,
+            "accuracy": self.location_accuracy
+        }
+    
+    @computed_field
+    @property
+    def quality_scores(self) -> Dict[str, Any]:
+        return {
+            "image_quality": self.image_quality_score,
+            "historical_interest": self.historical_interest_score,
+            "chicago_relevance": (self.ai_analysis_data or {}).get("chicago_relevance", 0)
+        }
+
+class RecentPhotoList(BaseModel):
+    photos: List[RecentPhotoOut]
+    # pass back as ?cursor=&cursor_id= for the next page
+    next_cursor: Optional[datetime] = None
+    next_cursor_id: Optional[str] = None
+
 @curation_router.post("/run-cycle")
 async def run_curation_cycle(
     max_photos: int = 25,
-    background_tasks: BackgroundTasks = BackgroundTasks(),
-    db: Session = Depends(get_db)
+    background_tasks: BackgroundTasks = BackgroundTasks()
 ):
     """
     Manually trigger a curation cycle
     """
     try:
         # Run curation in background
-        background_tasks.add_task(execute_curation_cycle, max_photos, db)
+        background_tasks.add_task(execute_curation_cycle, max_photos)
         
         return {
             "message": f"Curation cycle started for {max_photos} photos",
@@ -40,21 +275,21 @@ async def run_curation_cycle(
         raise HTTPException(status_code=500, detail=str(e))
 
 @curation_router.get("/status")
-async def get_curation_status(db: Session = Depends(get_db)):
+async def get_curation_status():
     """
     Get the status of the auto-curation system
     """
     try:
-        # Get recent curation logs
-        recent_logs = db.query(CurationLog).order_by(
-            CurationLog.cycle_date.desc()
-        ).limit(5).all()
-        
-        # Get database statistics
-        total_photos = db.query(HistoricalPhoto).count()
-        auto_curated = db.query(HistoricalPhoto).filter(
-            HistoricalPhoto.auto_curated == True
-        ).count()
+        cached = await get_cached_stats("status")
+        if cached is not None:
+            return cached
+        
+        # The log and count queries are independent; an AsyncSession can't run
+        # two statements at once, so each runs on its own session/connection
+        recent_logs, (total_photos, auto_curated) = await asyncio.gather(
+            fetch_recent_logs(),
+            fetch_photo_counts()
+        )
         
         # Calculate recent performance
         if recent_logs:
@@ -68,7 +303,7 @@ async def get_curation_status(db: Session = Depends(get_db)):
             total_discovered_recently = 0
             total_stored_recently = 0
         
-        return {
+        status = {
             "database_stats": {
                 "total_photos": total_photos,
                 "auto_curated_photos": auto_curated,
@@ -82,108 +317,82 @@ async def get_curation_status(db: Session = Depends(get_db)):
                 "photos_stored_recently": total_stored_recently
             },
             "system_health": {
-                "openai_configured": bool(os.getenv("OPENAI_API_KEY")),
-                "flickr_configured": bool(os.getenv("FLICKR_API_KEY")),
+                "openai_configured": OPENAI_CONFIGURED,
+                "flickr_configured": FLICKR_CONFIGURED,
                 "last_successful_cycle": latest_log.cycle_date if latest_log and latest_log.photos_stored > 0 else None
             }
         }
         
+        await store_cached_stats("status", status)
+        return status
+        
     except Exception as e:
         logger.error(f"Error getting curation status: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@curation_router.get("/logs")
+@curation_router.get("/logs", response_model=CurationLogList)
 async def get_curation_logs(
-    limit: int = 20,
-    db: Session = Depends(get_db)
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[datetime] = None,
+    cursor_id: Optional[uuid.UUID] = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Get recent curation cycle logs
+    Get recent curation cycle logs, newest first. Pages are keyed on
+    (cycle_date, id): pass the previous page's next_cursor and
+    next_cursor_id to continue.
     """
     try:
-        logs = db.query(CurationLog).order_by(
-            CurationLog.cycle_date.desc()
-        ).limit(limit).all()
-        
-        log_data = []
-        for log in logs:
-            log_data.append({
-                "id": str(log.id),
-                "cycle_date": log.cycle_date.isoformat(),
-                "photos_discovered": log.photos_discovered,
-                "photos_processed": log.photos_processed,
-                "photos_approved": log.photos_approved,
-                "photos_stored": log.photos_stored,
-                "duration_seconds": log.duration_seconds,
-                "success_rate": round(log.success_rate or 0, 2),
-                "sources": {
-                    "library_of_congress": log.library_of_congress_count,
-                    "flickr": log.flickr_count,
-                    "wikimedia": log.wikimedia_count,
-                    "unsplash": log.unsplash_count
-                },
-                "quality_metrics": {
-                    "avg_chicago_relevance": round(log.avg_chicago_relevance or 0, 1),
-                    "avg_image_quality": round(log.avg_image_quality or 0, 1),
-                    "avg_historical_value": round(log.avg_historical_value or 0, 1)
-                },
-                "error_count": log.error_count
-            })
-        
-        return {"logs": log_data}
+        query = select(*LOG_LIST_COLUMNS).where(CurationLog.cycle_date.isnot(None))
+        if cursor and cursor_id:
+            query = query.where(tuple_(CurationLog.cycle_date, CurationLog.id) < tuple_(cursor, cursor_id))
+        elif cursor:
+            query = query.where(CurationLog.cycle_date < cursor)
+        logs = (await db.execute(
+            query.order_by(CurationLog.cycle_date.desc(), CurationLog.id.desc()).limit(limit)
+        )).all()
+        
+        if len(logs) == limit:
+            return CurationLogList(logs=logs, next_cursor=logs[-1].cycle_date, next_cursor_id=str(logs[-1].id))
+        return CurationLogList(logs=logs)
         
     except Exception as e:
         logger.error(f"Error getting curation logs: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@curation_router.get("/photos/recent")
+@curation_router.get("/photos/recent", response_model=RecentPhotoList)
 async def get_recently_curated_photos(
-    limit: int = 20,
-    db: Session = Depends(get_db)
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[datetime] = None,
+    cursor_id: Optional[uuid.UUID] = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Get recently auto-curated photos
+    Get recently auto-curated photos, newest first. Pages are keyed on
+    (curation_date, id): pass the previous page's next_cursor and
+    next_cursor_id to continue. Photos without a curation_date are skipped.
     """
     try:
-        photos = db.query(HistoricalPhoto).filter(
-            HistoricalPhoto.auto_curated == True
-        ).order_by(
-            HistoricalPhoto.curation_date.desc()
-        ).limit(limit).all()
-        
-        photo_data = []
-        for photo in photos:
-            ai_analysis = {}
-            if photo.ai_analysis_data:
-                try:
-                    ai_analysis = json.loads(photo.ai_analysis_data)
-                except:
-                    pass
-            
-            photo_data.append({
-                "id": str(photo.id),
-                "filename": photo.filename,
-                "title": photo.title,
-                "year": photo.year,
-                "source": photo.source,
-                "source_url": photo.source_url,
-                "curation_date": photo.curation_date.isoformat() if photo.curation_date else None,
-                "location": {
-                    "latitude": photo.latitude,
-                    "longitude": photo.longitude,
-                    "accuracy": photo.location_accuracy
-                },
-                "landmarks": json.loads(photo.landmarks) if photo.landmarks else [],
-                "quality_scores": {
-                    "image_quality": photo.image_quality_score,
-                    "historical_interest": photo.historical_interest_score,
-                    "chicago_relevance": ai_analysis.get("chicago_relevance", 0),
-                },
-                "ai_approved": photo.approved_by_ai,
-                "needs_review": photo.manual_review_needed
-            })
-        
-        return {"photos": photo_data}
+        query = select(*RECENT_PHOTO_COLUMNS).where(
+            HistoricalPhoto.auto_curated == True,
+            HistoricalPhoto.curation_date.isnot(None)
+        )
+        if cursor and cursor_id:
+            query = query.where(
+                tuple_(HistoricalPhoto.curation_date, HistoricalPhoto.id) < tuple_(cursor, cursor_id)
+            )
+        elif cursor:
+            query = query.where(HistoricalPhoto.curation_date < cursor)
+        photos = (await db.execute(
+            query.order_by(
+                HistoricalPhoto.curation_date.desc(),
+                HistoricalPhoto.id.desc()
+            ).limit(limit)
+        )).all()
+        
+        if len(photos) == limit:
+            return RecentPhotoList(photos=photos, next_cursor=photos[-1].curation_date, next_cursor_id=str(photos[-1].id))
+        return RecentPhotoList(photos=photos)
         
     except Exception as e:
         logger.error(f"Error getting recent photos: {e}")
@@ -195,7 +404,7 @@ async def submit_photo_feedback(
     feedback_type: str,
     rating: int,
     comments: str = "",
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Submit feedback on auto-curated photos to improve AI
@@ -209,7 +418,7 @@ async def submit_photo_feedback(
             raise HTTPException(status_code=400, detail="Rating must be between 1 and 5")
         
         # Check if photo exists
-        photo = db.query(HistoricalPhoto).filter(HistoricalPhoto.id == photo_id).first()
+        photo = await db.scalar(select(HistoricalPhoto).where(HistoricalPhoto.id == photo_id))
         if not photo:
             raise HTTPException(status_code=404, detail="Photo not found")
         
@@ -223,10 +432,10 @@ async def submit_photo_feedback(
         )
         
         db.add(feedback)
-        db.commit()
+        await db.commit()
         
         # Update photo's user rating
-        update_photo_ratings(db, photo_id)
+        await update_photo_ratings(db, photo_id)
         
         return {
             "message": "Feedback submitted successfully",
@@ -242,17 +451,15 @@ async def submit_photo_feedback(
 @curation_router.post("/schedule/daily")
 async def schedule_daily_curation(
     enabled: bool = True,
-    max_photos_per_day: int = 50,
-    background_tasks: BackgroundTasks = BackgroundTasks()
+    max_photos_per_day: int = DEFAULT_DAILY_CURATION_PHOTOS
 ):
     """
     Enable/disable daily automatic curation
     """
     try:
         if enabled:
-            # In production, you'd use a proper task scheduler like Celery
-            # For now, we'll simulate with background tasks
-            background_tasks.add_task(schedule_daily_curation_task, max_photos_per_day)
+            curation_scheduler.modify_job(DAILY_CURATION_JOB_ID, kwargs={"max_photos": max_photos_per_day})
+            curation_scheduler.resume_job(DAILY_CURATION_JOB_ID)
             
             return {
                 "message": "Daily curation scheduled",
@@ -260,6 +467,7 @@ async def schedule_daily_curation(
                 "status": "enabled"
             }
         else:
+            curation_scheduler.pause_job(DAILY_CURATION_JOB_ID)
             return {
                 "message": "Daily curation disabled",
                 "status": "disabled"
@@ -272,49 +480,71 @@ async def schedule_daily_curation(
 @curation_router.get("/analytics")
 async def get_curation_analytics(
     days_back: int = 30,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get analytics on curation performance
     """
     try:
-        cutoff_date = datetime.utcnow() - timedelta(days=days_back)
-        
-        # Get logs from the specified period
-        logs = db.query(CurationLog).filter(
-            CurationLog.cycle_date >= cutoff_date
-        ).all()
-        
-        if not logs:
-            return {"message": "No curation data available for the specified period"}
+        cache_key = f"analytics:{days_back}"
+        cached = await get_cached_stats(cache_key)
+        if cached is not None:
+            return cached
         
-        # Calculate analytics
-        total_cycles = len(logs)
-        total_discovered = sum(log.photos_discovered or 0 for log in logs)
-        total_processed = sum(log.photos_processed or 0 for log in logs)
-        total_stored = sum(log.photos_stored or 0 for log in logs)
+        cutoff_date = datetime.utcnow() - timedelta(days=days_back)
         
-        avg_success_rate = sum(log.success_rate or 0 for log in logs) / total_cycles
-        avg_cycle_duration = sum(log.duration_seconds or 0 for log in logs) / total_cycles
+        # Aggregate the logs from the specified period in one query
+        def total(column):
+            return func.coalesce(func.sum(column), 0)
+        
+        def mean(column):
+            return func.avg(func.coalesce(column, 0))
+        
+        has_quality = CurationLog.avg_chicago_relevance != 0
+        stats = (await db.execute(
+            select(
+                func.count().label("total_cycles"),
+                total(CurationLog.photos_discovered).label("total_discovered"),
+                total(CurationLog.photos_processed).label("total_processed"),
+                total(CurationLog.photos_stored).label("total_stored"),
+                mean(CurationLog.success_rate).label("avg_success_rate"),
+                mean(CurationLog.duration_seconds).label("avg_cycle_duration"),
+                total(CurationLog.library_of_congress_count).label("library_of_congress"),
+                total(CurationLog.flickr_count).label("flickr"),
+                total(CurationLog.wikimedia_count).label("wikimedia"),
+                total(CurationLog.unsplash_count).label("unsplash"),
+                func.avg(CurationLog.avg_chicago_relevance).filter(has_quality).label("avg_chicago_relevance"),
+                func.avg(CurationLog.avg_image_quality).filter(has_quality).label("avg_image_quality"),
+                func.avg(CurationLog.avg_historical_value).filter(has_quality).label("avg_historical_value")
+            ).where(CurationLog.cycle_date >= cutoff_date)
+        )).one()
+        
+        if not stats.total_cycles:
+            analytics = {"message": "No curation data available for the specified period"}
+            await store_cached_stats(cache_key, analytics)
+            return analytics
+        
+        total_cycles = stats.total_cycles
+        total_discovered = stats.total_discovered
+        total_processed = stats.total_processed
+        total_stored = stats.total_stored
+        avg_success_rate = stats.avg_success_rate
+        avg_cycle_duration = stats.avg_cycle_duration
         
         # Source breakdown
         source_stats = {
-            "library_of_congress": sum(log.library_of_congress_count or 0 for log in logs),
-            "flickr": sum(log.flickr_count or 0 for log in logs),
-            "wikimedia": sum(log.wikimedia_count or 0 for log in logs),
-            "unsplash": sum(log.unsplash_count or 0 for log in logs)
+            "library_of_congress": stats.library_of_congress,
+            "flickr": stats.flickr,
+            "wikimedia": stats.wikimedia,
+            "unsplash": stats.unsplash
         }
         
-        # Quality metrics
-        quality_logs = [log for log in logs if log.avg_chicago_relevance]
-        if quality_logs:
-            avg_chicago_relevance = sum(log.avg_chicago_relevance for log in quality_logs) / len(quality_logs)
-            avg_image_quality = sum(log.avg_image_quality for log in quality_logs) / len(quality_logs)
-            avg_historical_value = sum(log.avg_historical_value for log in quality_logs) / len(quality_logs)
-        else:
-            avg_chicago_relevance = avg_image_quality = avg_historical_value = 0
+        # Quality metrics (cycles that recorded a Chicago relevance score)
+        avg_chicago_relevance = stats.avg_chicago_relevance or 0
+        avg_image_quality = stats.avg_image_quality or 0
+        avg_historical_value = stats.avg_historical_value or 0
         
-        return {
+        analytics = {
             "period_summary": {
                 "days_analyzed": days_back,
                 "total_cycles": total_cycles,
@@ -336,69 +566,107 @@ async def get_curation_analytics(
             }
         }
         
+        await store_cached_stats(cache_key, analytics)
+        return analytics
+        
     except Exception as e:
         logger.error(f"Error getting curation analytics: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 # Helper functions
-async def execute_curation_cycle(max_photos: int, db: Session):
+async def execute_curation_cycle(max_photos: int):
     """
-    Execute a curation cycle and log results
+    Execute a curation cycle and log results. Runs after the triggering
+    request has finished, so it opens its own session.
     """
     try:
+        # The cycle blocks on its download/analysis threads; keep it off the event loop
         curator = AIPhotoCurator()
-        results = curator.run_curation_cycle(max_photos)
+        running_curators.add(curator)
+        try:
+            results = await asyncio.to_thread(curator.run_curation_cycle, max_photos)
+        finally:
+            running_curators.discard(curator)
         
         # Log results to database
         log_entry = CurationLog(
             photos_discovered=results.get("discovered", 0),
             photos_processed=results.get("processed", 0),
             photos_stored=results.get("stored", 0),
-            duration_seconds=results.get("duration_minutes", 0) * 60,
-            success_rate=(results.get("stored", 0) / max(results.get("processed", 1), 1)) * 100
+            duration_seconds=results.get("duration_minutes", 0) * 60
         )
         
-        db.add(log_entry)
-        db.commit()
+        async with AsyncSessionLocal() as db:
+            db.add(log_entry)
+            await db.commit()
+        await clear_cached_stats()
         
         logger.info(f"Curation cycle completed: {results}")
         
     except Exception as e:
         logger.error(f"Curation cycle execution failed: {e}")
 
-def update_photo_ratings(db: Session, photo_id: str):
+async def fetch_recent_logs(limit: int = 5) -> List[CurationLog]:
+    """Most recent curation logs, in a session of their own"""
+    async with AsyncSessionLocal() as db:
+        return (await db.scalars(
+            select(CurationLog).order_by(CurationLog.cycle_date.desc()).limit(limit)
+        )).all()
+
+async def fetch_photo_counts() -> tuple:
+    """(total, auto-curated) photo counts in one scan, in a session of their own"""
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(
+            select(
+                func.count(),
+                func.count().filter(HistoricalPhoto.auto_curated == True)
+            ).select_from(HistoricalPhoto)
+        )).one()
+
+async def update_photo_ratings(db: AsyncSession, photo_id: str):
     """
     Update photo's average user rating based on feedback
     """
     try:
-        feedbacks = db.query(PhotoQualityFeedback).filter(
-            PhotoQualityFeedback.photo_id == photo_id
-        ).all()
-        
-        if feedbacks:
-            avg_rating = sum(f.rating for f in feedbacks) / len(feedbacks)
-            
-            photo = db.query(HistoricalPhoto).filter(HistoricalPhoto.id == photo_id).first()
-            if photo:
-                photo.user_rating_avg = avg_rating
-                photo.user_rating_count = len(feedbacks)
-                db.commit()
+        # One UPDATE with the aggregates computed by the database
+        photo_feedback = PhotoQualityFeedback.photo_id == photo_id
+        await db.execute(
+            update(HistoricalPhoto).where(
+                HistoricalPhoto.id == photo_id,
+                select(PhotoQualityFeedback.id).where(photo_feedback).exists()
+            ).values(
+                user_rating_avg=select(func.avg(PhotoQualityFeedback.rating)).where(photo_feedback).scalar_subquery(),
+                user_rating_count=select(func.count()).where(photo_feedback).scalar_subquery()
+            )
+        )
+        await db.commit()
                 
     except Exception as e:
         logger.error(f"Error updating photo ratings: {e}")
 
-async def schedule_daily_curation_task(max_photos: int):
+def stop_curation_cycles():
+    """Ask every cycle in progress to skip its remaining photos and finish"""
+    for curator in list(running_curators):
+        curator.stop()
+
+def start_curation_scheduler():
     """
-    Background task for daily curation (simplified version)
-    In production, use proper task scheduler like Celery
+    Start the scheduler. The daily job is registered paused the first time;
+    after that its stored state is kept. Workers that don't run jobs
+    (CURATION_SCHEDULER_RUN_JOBS) start it paused.
     """
-    try:
-        import asyncio
-        await asyncio.sleep(24 * 60 * 60)  # Wait 24 hours
-        
-        # Run curation
-        results = schedule_curation_cycles()
-        logger.info(f"Scheduled daily curation completed: {results}")
-        
-    except Exception as e:
-        logger.error(f"Daily curation task failed: {e}")
+    curation_scheduler.start(paused=not CURATION_SCHEDULER_RUN_JOBS)
+    if curation_scheduler.get_job(DAILY_CURATION_JOB_ID) is None:
+        curation_scheduler.add_job(
+            run_daily_curation,
+            CronTrigger(hour=DAILY_CURATION_HOUR_UTC),
+            id=DAILY_CURATION_JOB_ID,
+            kwargs={"max_photos": DEFAULT_DAILY_CURATION_PHOTOS},
+            next_run_time=None,
+            coalesce=True,
+            max_instances=1
+        )
+
+async def run_daily_curation(max_photos: int):
+    """Scheduled daily curation cycle"""
+    await execute_curation_cycle(max_photos)
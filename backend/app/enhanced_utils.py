@@ -1,51 +1,86 @@
 # backend/app/enhanced_utils.py
 import os
+import copy
 import json
 import math
-import random
-from typing import Optional, Dict, List, Any
+import hashlib
+import struct
+from collections import OrderedDict
+from typing import Optional, Dict, List, Any, Tuple
 from PIL import Image
 from PIL.ExifTags import TAGS, GPSTAGS
+import numpy as np
 import piexif
 import logging
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 # Import our comprehensive data
-from chicago_data import CHICAGO_HISTORICAL_PHOTOS, get_historical_story
+from chicago_data import (
+    CHICAGO_HISTORICAL_PHOTOS,
+    PHOTO_INTEREST_SCORES,
+    PHOTO_LANDMARK_MATRIX,
+    PHOTO_LATITUDES,
+    PHOTO_LONGITUDES,
+    get_historical_story,
+    heading_mask,
+    landmark_vector,
+    photo_indices_within
+)
 from ai_vision import enhance_location_detection
+from geo_kernels import equirectangular_km, haversine_km
 
 logger = logging.getLogger(__name__)
 
-def extract_enhanced_metadata(image: Image.Image, image_bytes: bytes, gps_data: Dict, heading: Optional[float]) -> Dict[str, Any]:
+# Visual features (dominant colors, brightness, contrast) are measured on a
+# reduced copy of the photo, so the cost stays the same whatever the
+# upload's resolution
+DOMINANT_COLORS_SAMPLE_DIMENSION = 256
+
+# Visual features and EXIF GPS of recent uploads, keyed by a digest of the
+# file: retries and re-sent photos skip the pixel work. In-process LRU.
+LOCAL_FEATURE_CACHE_SIZE = 128
+
+_local_feature_cache: "OrderedDict[bytes, tuple]" = OrderedDict()  # digest -> (visual_features, exif_gps)
+
+# TIFF tags read straight from the EXIF block: the GPS IFD pointer in IFD0
+# and the four GPS position tags (same numbering as piexif.GPSIFD)
+EXIF_GPS_IFD_POINTER = 0x8825
+EXIF_GPS_POSITION_TAGS = (1, 2, 3, 4)  # LatitudeRef, Latitude, LongitudeRef, Longitude
+
+async def extract_enhanced_metadata(image: Image.Image, image_bytes: bytes, gps_data: Dict, heading: Optional[float],
+                                    original_size: Optional[Tuple[int, int]] = None) -> Dict[str, Any]:
     """
-    Extract comprehensive metadata using AI vision analysis
+    Extract comprehensive metadata using AI vision analysis.
+    original_size is the photo's size before a reduced-scale (draft) decode.
     """
+    size = original_size or image.size
     metadata = {
         "gps": gps_data,
         "heading": heading,
         "image_info": {
-            "size": image.size,
+            "size": size,
             "mode": image.mode,
             "format": image.format
         },
-        "visual_features": extract_visual_features(image),
+        "visual_features": None,
         "exif_gps": None
     }
-    
-    # Try to extract EXIF GPS as backup/validation
-    try:
-        exif_dict = piexif.load(image_bytes)
-        gps_ifd = exif_dict.get("GPS", {})
-        if gps_ifd:
-            metadata["exif_gps"] = parse_gps_from_exif(gps_ifd)
-    except Exception as e:
-        logger.warning(f"Could not extract EXIF GPS: {e}")
+    metadata["visual_features"], metadata["exif_gps"] = extract_image_features(image, image_bytes)
+    # Features are measured on the decoded pixels; the shape is the photo's own
+    metadata["visual_features"]["aspect_ratio"] = size[0] / size[1]
+    metadata["visual_features"]["resolution"] = size[0] * size[1]
     
     # Enhanced location detection using AI
     try:
-        enhanced_location = enhance_location_detection(
+        enhanced_location = await enhance_location_detection(
             image, 
             metadata["exif_gps"], 
-            gps_data
+            gps_data,
+            image_bytes
         )
         metadata["enhanced_location"] = enhanced_location
         
@@ -61,43 +96,179 @@ def extract_enhanced_metadata(image: Image.Image, image_bytes: bytes, gps_data:
     
     return metadata
 
+def extract_image_features(image: Image.Image, image_bytes: bytes) -> Tuple[Dict[str, Any], Optional[Dict[str, float]]]:
+    """
+    Visual features and EXIF GPS of an upload, from the feature cache when
+    the same file was seen recently
+    """
+    key = hashlib.blake2b(image_bytes, digest_size=16).digest()
+    cached = _local_feature_cache.get(key)
+    if cached is not None:
+        _local_feature_cache.move_to_end(key)
+        return copy.deepcopy(cached)
+    
+    visual_features = extract_visual_features(image)
+    exif_gps = None
+    
+    # Try to extract EXIF GPS as backup/validation. PIL has already located
+    # the EXIF block while opening the file; without one there is nothing to parse
+    exif_bytes = image.info.get("exif")
+    if exif_bytes:
+        try:
+            try:
+                gps_ifd = read_gps_ifd(exif_bytes)
+            except (ValueError, struct.error):
+                # Unusual layout: let piexif parse the whole block
+                gps_ifd = piexif.load(exif_bytes).get("GPS", {})
+            if gps_ifd:
+                exif_gps = parse_gps_from_exif(gps_ifd)
+        except Exception as e:
+            logger.warning(f"Could not extract EXIF GPS: {e}")
+    
+    _local_feature_cache[key] = copy.deepcopy((visual_features, exif_gps))
+    while len(_local_feature_cache) > LOCAL_FEATURE_CACHE_SIZE:
+        _local_feature_cache.popitem(last=False)
+    return visual_features, exif_gps
+
 def extract_visual_features(image: Image.Image) -> Dict[str, Any]:
     """
-    Extract basic visual features for matching
+    Extract basic visual features for matching. Pixel statistics are all
+    measured on one copy reduced to about DOMINANT_COLORS_SAMPLE_DIMENSION
+    pixels a side, with or without numba, so the cost is bounded.
     """
     if image.mode != 'RGB':
         image = image.convert('RGB')
+    sample = _reduced_sample(image)
     
-    # Basic color analysis
-    colors = image.getcolors(maxcolors=256*256*256)
-    dominant_colors = sorted(colors, key=lambda x: x[0], reverse=True)[:5] if colors else []
+    if njit is not None:
+        # Both histograms in one compiled pass over the sample's pixels
+        luma_histogram, color_counts = pixel_histograms(np.asarray(sample))
+        brightness, contrast = _histogram_brightness_contrast(luma_histogram)
+        dominant_colors = _top_color_buckets(color_counts, 3)
+    else:
+        brightness, contrast = calculate_brightness_contrast(sample)
+        dominant_colors = calculate_dominant_colors(sample, 3)
     
     features = {
-        "dominant_colors": [(count, color) for count, color in dominant_colors[:3]],
-        "brightness": calculate_brightness(image),
-        "contrast": calculate_contrast(image),
+        "dominant_colors": dominant_colors,
+        "brightness": brightness,
+        "contrast": contrast,
         "aspect_ratio": image.size[0] / image.size[1],
         "resolution": image.size[0] * image.size[1]
     }
     
     return features
 
-def calculate_brightness(image: Image.Image) -> float:
-    """Calculate average brightness of image"""
-    grayscale = image.convert('L')
-    histogram = grayscale.histogram()
-    pixels = sum(histogram)
-    brightness = sum(i * histogram[i] for i in range(256)) / pixels
-    return brightness / 255.0
+def calculate_dominant_colors(image: Image.Image, top: int = 3) -> List[tuple]:
+    """
+    Most common colors as (count, (r, g, b)), most frequent first. Colors are
+    counted in 5-bit-per-channel buckets (32K bins) and reported as each
+    bucket's lower corner, on a copy box-reduced to about
+    DOMINANT_COLORS_SAMPLE_DIMENSION pixels a side (counts are of its pixels).
+    """
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    pixels = np.asarray(_reduced_sample(image))
+    keys = (
+        (pixels[..., 0] >> 3).astype(np.uint16) << 10
+        | (pixels[..., 1] >> 3).astype(np.uint16) << 5
+        | (pixels[..., 2] >> 3)
+    )
+    return _top_color_buckets(np.bincount(keys.ravel(), minlength=1 << 15), top)
+
+def _reduced_sample(image: Image.Image) -> Image.Image:
+    """The image box-reduced to about DOMINANT_COLORS_SAMPLE_DIMENSION pixels a side (itself if already small)"""
+    factor = max(image.size) // DOMINANT_COLORS_SAMPLE_DIMENSION
+    return image.reduce(factor) if factor > 1 else image
 
-def calculate_contrast(image: Image.Image) -> float:
-    """Calculate contrast of image"""
-    grayscale = image.convert('L')
-    histogram = grayscale.histogram()
-    pixels = sum(histogram)
-    mean = sum(i * histogram[i] for i in range(256)) / pixels
-    variance = sum(((i - mean) ** 2) * histogram[i] for i in range(256)) / pixels
-    return math.sqrt(variance) / 255.0
+def _top_color_buckets(counts: np.ndarray, top: int) -> List[tuple]:
+    """The top most counted 5-bit color buckets as (count, (r, g, b))"""
+    top = min(top, np.count_nonzero(counts))
+    best = np.argpartition(counts, -top)[-top:] if top else []
+    best = sorted(best, key=lambda key: counts[key], reverse=True)
+    return [
+        (int(counts[key]), ((key >> 10 & 31) << 3, (key >> 5 & 31) << 3, (key & 31) << 3))
+        for key in map(int, best)
+    ]
+
+def calculate_brightness_contrast(image: Image.Image) -> Tuple[float, float]:
+    """
+    Average brightness and contrast (standard deviation) of the image, both
+    0-1, from a single grayscale histogram
+    """
+    return _histogram_brightness_contrast(np.array(image.convert('L').histogram()))
+
+def _histogram_brightness_contrast(histogram: np.ndarray) -> Tuple[float, float]:
+    """Mean and standard deviation, both 0-1, of a 256-bin grayscale histogram"""
+    histogram = histogram.astype(np.float64)
+    levels = np.arange(256)
+    pixels = histogram.sum()
+    mean = levels @ histogram / pixels
+    variance = (levels - mean) ** 2 @ histogram / pixels
+    return float(mean / 255.0), float(math.sqrt(variance) / 255.0)
+
+def _pixel_histograms_loop(rgb: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Grayscale histogram (Pillow's integer ITU-R 601 luma, so it matches
+    convert('L')) and 5-bit color bucket counts of an RGB array, in a single
+    pass over the pixels (compiled by numba)
+    """
+    luma = np.zeros(256, dtype=np.int64)
+    colors = np.zeros(1 << 15, dtype=np.int64)
+    for y in range(rgb.shape[0]):
+        for x in range(rgb.shape[1]):
+            r = np.int64(rgb[y, x, 0])
+            g = np.int64(rgb[y, x, 1])
+            b = np.int64(rgb[y, x, 2])
+            luma[(r * 19595 + g * 38470 + b * 7471 + 0x8000) >> 16] += 1
+            colors[(r >> 3) << 10 | (g >> 3) << 5 | (b >> 3)] += 1
+    return luma, colors
+
+# Only used when numba is installed; the numpy path takes Pillow's grayscale
+# histogram and a bincount of the same reduced copy instead
+pixel_histograms = njit(cache=True)(_pixel_histograms_loop) if njit is not None else _pixel_histograms_loop
+
+def read_gps_ifd(exif_bytes: bytes) -> Dict[int, Any]:
+    """
+    The GPS position tags of an EXIF block in piexif's format ({tag: value},
+    refs as bytes, coordinates as (numerator, denominator) triples), reading
+    only the TIFF header, IFD0's GPS pointer and the GPS IFD. Raises
+    ValueError or struct.error on blocks it can't follow.
+    """
+    data = memoryview(exif_bytes)
+    base = 6 if exif_bytes.startswith(b"Exif\x00\x00") else 0
+    byte_order = {b"II": "<", b"MM": ">"}.get(bytes(data[base:base + 2]))
+    if byte_order is None or struct.unpack_from(byte_order + "H", data, base + 2)[0] != 42:
+        raise ValueError("Not a TIFF header")
+    
+    def entries(ifd_offset: int):
+        count = struct.unpack_from(byte_order + "H", data, base + ifd_offset)[0]
+        for position in range(base + ifd_offset + 2, base + ifd_offset + 2 + 12 * count, 12):
+            yield position, struct.unpack_from(byte_order + "HHI", data, position)
+    
+    ifd0_offset = struct.unpack_from(byte_order + "I", data, base + 4)[0]
+    gps_offset = None
+    for position, (tag, _, _) in entries(ifd0_offset):
+        if tag == EXIF_GPS_IFD_POINTER:
+            gps_offset = struct.unpack_from(byte_order + "I", data, position + 8)[0]
+            break
+    if gps_offset is None:
+        return {}
+    
+    gps_ifd = {}
+    for position, (tag, value_type, count) in entries(gps_offset):
+        if tag not in EXIF_GPS_POSITION_TAGS:
+            continue
+        if value_type == 2:  # ASCII, stored inline when it fits in 4 bytes
+            start = position + 8 if count <= 4 else base + struct.unpack_from(byte_order + "I", data, position + 8)[0]
+            gps_ifd[tag] = bytes(data[start:start + count]).split(b"\x00", 1)[0]
+        elif value_type in (5, 10):  # (S)RATIONAL pairs, always at an offset
+            start = base + struct.unpack_from(byte_order + "I", data, position + 8)[0]
+            values = struct.unpack_from(byte_order + ("I" if value_type == 5 else "i") * (2 * count), data, start)
+            gps_ifd[tag] = tuple(zip(values[::2], values[1::2]))
+        else:
+            raise ValueError(f"Unexpected type {value_type} for GPS tag {tag}")
+    return gps_ifd
 
 def parse_gps_from_exif(gps_ifd: Dict) -> Optional[Dict[str, float]]:
     """Parse GPS coordinates from EXIF data"""
@@ -142,13 +313,10 @@ def find_best_historical_match(metadata: Dict[str, Any]) -> Optional[Dict[str, A
     
     logger.info(f"Searching for matches near {lat}, {lon}")
     
-    # Load our comprehensive historical database
-    historical_db = CHICAGO_HISTORICAL_PHOTOS
-    
     # Strategy 1: Geographic proximity
-    candidates = filter_by_proximity(historical_db, lat, lon, radius_km=1.0)  # Increased radius
+    candidates = filter_by_proximity(lat, lon, radius_km=1.0)  # Increased radius
     
-    if not candidates:
+    if not len(candidates):
         logger.warning(f"No candidates found within 1km of {lat}, {lon}")
         return None
     
@@ -157,144 +325,113 @@ def find_best_historical_match(metadata: Dict[str, Any]) -> Optional[Dict[str, A
     # Strategy 2: Filter by viewing angle/heading
     if heading is not None:
         heading_filtered = filter_by_heading(candidates, heading, tolerance_degrees=60)
-        if heading_filtered:
+        if len(heading_filtered):
             candidates = heading_filtered
             logger.info(f"Filtered to {len(candidates)} candidates by heading")
     
-    # Strategy 3: Enhanced scoring with AI analysis
-    scored_candidates = []
+    # Strategy 3: Enhanced scoring with AI analysis, over the candidates' columns
     ai_analysis = metadata.get("enhanced_location", {}).get("ai_analysis", {})
+    ai_landmarks = set(ai_analysis.get("landmarks", []))
     
-    for candidate in candidates:
-        # Distance scoring
-        distance = calculate_distance(lat, lon, candidate["latitude"], candidate["longitude"])
-        distance_score = max(0, 1 - (distance / 2.0))  # Normalize to 0-1
-        
-        # AI landmark matching
-        ai_landmarks = ai_analysis.get("landmarks", [])
-        candidate_landmarks = candidate.get("landmarks", [])
-        landmark_matches = len(set(ai_landmarks) & set(candidate_landmarks))
-        landmark_score = min(landmark_matches * 0.3, 1.0)
-        
-        # Historical interest score
-        interest_score = candidate.get("historical_interest_score", 0.5)
-        
-        # Combine scores
-        combined_score = (
-            distance_score * 0.4 +  # Distance is important
-            landmark_score * 0.3 +  # AI landmark matching
-            interest_score * 0.3    # Historical significance
-        )
-        
-        candidate_copy = candidate.copy()
-        candidate_copy["match_score"] = combined_score
-        candidate_copy["distance_meters"] = distance * 1000
-        candidate_copy["landmark_matches"] = landmark_matches
-        
-        scored_candidates.append(candidate_copy)
+    # Distance scoring (candidates are within 1 km, so the flat approximation holds)
+    distances = equirectangular_km(PHOTO_LATITUDES[candidates], PHOTO_LONGITUDES[candidates], lat, lon)
+    distance_scores = np.maximum(0, 1 - (distances / 2.0))  # Normalize to 0-1
     
-    # Return best match
-    if scored_candidates:
-        best_match = max(scored_candidates, key=lambda x: x["match_score"])
-        best_match["match_method"] = "comprehensive_ai_analysis"
-        
-        logger.info(f"Best match: {best_match['title']} ({best_match['year']}) with score {best_match['match_score']:.2f}")
-        return best_match
+    # Historical interest score
+    interest_scores = PHOTO_INTEREST_SCORES[candidates]
     
-    return None
+    # AI landmark matching: landmarks shared with each candidate, as one
+    # product of the candidates' landmark rows with the AI landmarks
+    landmark_matches = PHOTO_LANDMARK_MATRIX[candidates] @ landmark_vector(ai_landmarks)
+    landmark_scores = np.minimum(landmark_matches * 0.3, 1.0)
+    
+    # Combine scores
+    combined_scores = (
+        distance_scores * 0.4 +  # Distance is important
+        landmark_scores * 0.3 +  # AI landmark matching
+        interest_scores * 0.3    # Historical significance
+    )
+    
+    # Return best match
+    best = int(np.argmax(combined_scores))
+    best_match = CHICAGO_HISTORICAL_PHOTOS[candidates[best]].copy()
+    best_match["match_score"] = float(combined_scores[best])
+    best_match["distance_meters"] = float(distances[best]) * 1000
+    best_match["landmark_matches"] = int(landmark_matches[best])
+    best_match["match_method"] = "comprehensive_ai_analysis"
+    
+    logger.info(f"Best match: {best_match['title']} ({best_match['year']}) with score {best_match['match_score']:.2f}")
+    return best_match
 
-def filter_by_proximity(database: List[Dict], lat: float, lon: float, radius_km: float = 1.0) -> List[Dict]:
-    """Filter historical photos by geographic proximity"""
-    candidates = []
-    for item in database:
-        distance = calculate_distance(lat, lon, item["latitude"], item["longitude"])
-        if distance <= radius_km:
-            candidates.append(item)
-    return candidates
+def filter_by_proximity(lat: float, lon: float, radius_km: float = 1.0) -> np.ndarray:
+    """
+    Indices of historical photos within radius_km of a point: a KD-tree
+    ball query picks the candidates, haversine confirms them
+    """
+    candidates = photo_indices_within(lat, lon, radius_km)
+    distances = haversine_km(PHOTO_LATITUDES[candidates], PHOTO_LONGITUDES[candidates], lat, lon)
+    return candidates[distances <= radius_km]
 
-def filter_by_heading(candidates: List[Dict], user_heading: float, tolerance_degrees: int = 60) -> List[Dict]:
-    """Filter by viewing direction/heading"""
+def filter_by_heading(candidates: np.ndarray, user_heading: float, tolerance_degrees: int = 60) -> np.ndarray:
+    """
+    Candidate indices whose viewing range, widened by tolerance_degrees on
+    each side, contains the user's heading
+    """
     if user_heading is None:
         return candidates
-    
-    filtered = []
-    for candidate in candidates:
-        start = candidate.get("viewing_direction_start", 0)
-        end = candidate.get("viewing_direction_end", 360)
-        
-        # Check if user heading falls within the photo's viewing range
-        if start <= end:
-            in_range = start <= user_heading <= end
-        else:  # Range crosses 0 degrees (e.g., 350-30)
-            in_range = user_heading >= start or user_heading <= end
-            
-        # Also check with tolerance
-        if in_range or any(abs(user_heading - h) <= tolerance_degrees for h in [start, end]):
-            filtered.append(candidate)
-    
-    return filtered
+    return candidates[heading_mask(user_heading, tolerance_degrees, candidates)]
 
-def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-    """Calculate distance between two GPS coordinates in kilometers"""
-    R = 6371  # Earth's radius in km
-    
-    dlat = math.radians(lat2 - lat1)
-    dlon = math.radians(lon2 - lon1)
-    
-    a = (math.sin(dlat/2) * math.sin(dlat/2) + 
-         math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * 
-         math.sin(dlon/2) * math.sin(dlon/2))
-    
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-    return R * c
+def _confidence_scores(distances_km: np.ndarray, landmark_matches: np.ndarray, match_scores: np.ndarray,
+                       location_confidence: float, chicago_likelihood: float,
+                       has_ai_landmarks: bool, has_heading: bool) -> np.ndarray:
+    """Branchless confidence percentages for a batch of candidates (compiled by numba)"""
+    confidence = (
+        50.0
+        + np.trunc(location_confidence * 30)
+        + 15.0 * (chicago_likelihood > 0.7)
+        + 10.0 * has_ai_landmarks
+        + 8.0 * has_heading
+        # Distance penalty/bonus
+        + 20.0 * (distances_km < 0.2)
+        + 10.0 * ((distances_km >= 0.2) & (distances_km < 0.5))
+        - 15.0 * (distances_km > 1.5)
+        + 5.0 * np.maximum(landmark_matches, 0.0)
+        + np.trunc(match_scores * 20)
+    )
+    return np.minimum(np.maximum(confidence, 20.0), 95.0)
+
+confidence_scores = njit(cache=True)(_confidence_scores) if njit is not None else _confidence_scores
 
 def calculate_confidence_score(metadata: Dict, match: Dict) -> int:
     """Calculate confidence percentage for the match"""
-    base_confidence = 50
-    
-    # Enhanced location analysis confidence
     enhanced_location = metadata.get("enhanced_location", {})
-    location_confidence = enhanced_location.get("confidence_score", 0.3)
-    base_confidence += int(location_confidence * 30)
-    
-    # AI analysis boosts
     ai_analysis = enhanced_location.get("ai_analysis", {})
-    if ai_analysis.get("chicago_likelihood", 0) > 0.7:
-        base_confidence += 15
-    
-    if ai_analysis.get("landmarks"):
-        base_confidence += 10
-    
-    # Distance penalty/bonus
-    distance_km = match.get("distance_meters", 0) / 1000
-    if distance_km < 0.2:
-        base_confidence += 20
-    elif distance_km < 0.5:
-        base_confidence += 10
-    elif distance_km > 1.5:
-        base_confidence -= 15
-    
-    # Landmark matches bonus
-    if match.get("landmark_matches", 0) > 0:
-        base_confidence += match["landmark_matches"] * 5
     
-    # Heading match bonus
-    if metadata.get("heading") is not None:
-        base_confidence += 8
-    
-    # Match score bonus
-    match_score = match.get("match_score", 0.5)
-    base_confidence += int(match_score * 20)
-    
-    return min(max(base_confidence, 20), 95)
+    confidence = confidence_scores(
+        np.array([match.get("distance_meters", 0) / 1000], dtype=np.float64),
+        np.array([match.get("landmark_matches", 0)], dtype=np.float64),
+        np.array([match.get("match_score", 0.5)], dtype=np.float64),
+        float(enhanced_location.get("confidence_score", 0.3)),
+        float(ai_analysis.get("chicago_likelihood", 0)),
+        bool(ai_analysis.get("landmarks")),
+        metadata.get("heading") is not None
+    )
+    return int(confidence[0])
+
+def warm_up_scoring():
+    """Compile the confidence and pixel kernels so the first request doesn't pay the JIT cost"""
+    one = np.zeros(1)
+    confidence_scores(one, one, one, 0.0, 0.0, False, False)
+    if njit is not None:
+        pixel_histograms(np.zeros((1, 1, 3), dtype=np.uint8))
 
 def generate_historical_story(match: Dict, metadata: Dict) -> Dict[str, str]:
     """Generate contextual story using our comprehensive database"""
     year = match.get("year", 1950)
     landmarks = match.get("landmarks", [])
     
-    # Use our comprehensive story database
-    story = get_historical_story(year, landmarks)
+    # Use our comprehensive story database (cached and read-only, so copy it)
+    story = get_historical_story(year, landmarks[0].lower() if landmarks else None)._asdict()
     
     # Add specific context from the match
     if match.get("story_context"):
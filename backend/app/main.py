@@ -12,11 +12,14 @@ from enhanced_utils import (
     extract_enhanced_metadata, 
     find_best_historical_match, 
     generate_historical_story,
-    calculate_confidence_score
+    calculate_confidence_score,
+    warm_up_scoring
 )
 from stripe_webhook import stripe_webhook_router
-from curation_api import curation_router
-from database import create_tables, seed_initial_data, SessionLocal
+from curation_api import curation_router, curation_scheduler, start_curation_scheduler, stop_curation_cycles
+from database import create_tables, seed_initial_data, SessionLocal, HistoricalPhoto
+from geo_kernels import warm_up_kernels
+from ai_vision import vision_batcher
 import logging
 
 # Configure logging
@@ -25,18 +28,35 @@ logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Street Time Machine - AI-Enhanced Backend")
 
+# Uploads are read in chunks up to this size; anything larger is rejected
+# before it is held in memory
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(25 * 1024 * 1024)))
+UPLOAD_CHUNK_BYTES = 64 * 1024
+
+# Historical images never change once published, so clients and CDNs may
+# keep them for a year without revalidating
+HISTORICAL_IMAGES_DIR = os.path.join(os.path.dirname(__file__), "static_historical")
+HISTORICAL_IMAGE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# JPEGs are decoded at a reduced scale (DCT scaling), never below this size;
+# matching and the vision upload don't need more pixels
+DECODE_MIN_DIMENSION = 1024
+
 # Initialize database on startup
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database and seed data on startup"""
+    """Initialize database and seed data on startup, then warm up the matcher"""
+    vision_batcher.start()
+    
     try:
         create_tables()
         logger.info("Database tables created/verified")
         
+        start_curation_scheduler()
+        
         # Seed initial data if database is empty
         db = SessionLocal()
         try:
-            from database import HistoricalPhoto
             count = db.query(HistoricalPhoto).count()
             if count == 0:
                 seed_initial_data(db)
@@ -48,6 +68,22 @@ async def startup_event():
             
     except Exception as e:
         logger.error(f"Startup error: {e}")
+    
+    # JIT-compile the numba kernels now rather than on the first request; a
+    # failure here only costs that first request the compile time
+    try:
+        warm_up_kernels()
+        warm_up_scoring()
+    except Exception as e:
+        logger.error(f"Kernel warm-up failed: {e}")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the curation scheduler, any running curation cycle and the vision batcher"""
+    if curation_scheduler.running:
+        curation_scheduler.shutdown(wait=False)
+    stop_curation_cycles()
+    await vision_batcher.stop()
 
 # CORS - allow your frontend origin
 app.add_middleware(
@@ -79,14 +115,16 @@ async def process_photo(file: UploadFile = File(...), metadata: str = Form(...))
         logger.info(f"Processing photo for location: {gps_data['latitude']}, {gps_data['longitude']}")
         
         # Read and validate image
-        contents = await file.read()
+        contents = await read_upload(file)
         try:
-            image = Image.open(io.BytesIO(contents))
+            image = Image.open(io.BytesIO(contents))  # shares the bytes, no copy
+            original_size = image.size  # draft() replaces it with the decoded size
+            image.draft("RGB", (DECODE_MIN_DIMENSION, DECODE_MIN_DIMENSION))
         except Exception as e:
             raise HTTPException(status_code=400, detail=f"Invalid image: {e}")
         
         # Extract enhanced metadata (EXIF + visual features)
-        enhanced_metadata = extract_enhanced_metadata(image, contents, gps_data, heading)
+        enhanced_metadata = await extract_enhanced_metadata(image, contents, gps_data, heading, original_size)
         
         # Find best historical match using multiple strategies
         match_result = find_best_historical_match(enhanced_metadata)
@@ -123,22 +161,46 @@ async def process_photo(file: UploadFile = File(...), metadata: str = Form(...))
         
     except json.JSONDecodeError:
         raise HTTPException(status_code=400, detail="Invalid metadata format")
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error processing photo: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Processing error: {str(e)}")
 
+async def read_upload(file: UploadFile) -> bytes:
+    """Read an upload in chunks, rejecting it once it exceeds MAX_UPLOAD_BYTES"""
+    if file.size is not None and file.size > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="Photo is too large")
+    
+    chunks = []
+    received = 0
+    while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+        received += len(chunk)
+        if received > MAX_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail="Photo is too large")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
 @app.get("/historical/{image_name}")
 async def historical_image(image_name: str):
     """
     Serves historical images. In production, use CDN/S3.
     """
-    static_dir = os.path.join(os.path.dirname(__file__), "static_historical")
-    candidate = os.path.join(static_dir, image_name)
+    # Plain file names inside the static directory only
+    if image_name != os.path.basename(image_name) or image_name.startswith("."):
+        raise HTTPException(status_code=404, detail="Historical image not found")
+    
+    candidate = os.path.join(HISTORICAL_IMAGES_DIR, image_name)
     
-    if not os.path.exists(candidate):
+    if not os.path.isfile(candidate):
         raise HTTPException(status_code=404, detail="Historical image not found")
     
-    return FileResponse(candidate, media_type="image/jpeg")
+    # FileResponse adds ETag/Last-Modified and handles Range requests
+    return FileResponse(
+        candidate,
+        media_type="image/jpeg",
+        headers={"Cache-Control": HISTORICAL_IMAGE_CACHE_CONTROL}
+    )
 
 @app.get("/health")
 async def health_check():
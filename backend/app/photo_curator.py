@@ -3,25 +3,299 @@
 AI-powered photo curation system that automatically finds, analyzes, and stores historical Chicago photos
 """
 import os
-import requests
+import sys
+import math
+import httpx
 import json
 import time
 import hashlib
-from typing import List, Dict, Optional
+import queue
+import threading
+from collections import OrderedDict
+from string import Template
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Dict, Optional, Tuple
+from urllib.parse import urlparse
 from datetime import datetime, timedelta
-import openai
+import numpy as np
 from PIL import Image
 import io
 import logging
 from dataclasses import dataclass
 
-from ai_vision import analyze_photo_with_ai, encode_image_to_base64
+try:
+    import orjson  # faster JSON for model responses and cache entries; stdlib json otherwise
+except ImportError:
+    orjson = None
+
+try:
+    import xxhash  # fast non-cryptographic URL digests; blake2b otherwise
+except ImportError:
+    xxhash = None
+
+try:
+    import mozjpeg_lossless_optimization  # ~15% smaller JPEGs, bit-identical pixels; optional
+except ImportError:
+    mozjpeg_lossless_optimization = None
+
+try:
+    import redis  # remembers assessed URLs across cycles; optional
+except ImportError:
+    redis = None
+
+try:
+    import pybase64 as base64  # SIMD-accelerated, same API as the stdlib module
+except ImportError:
+    import base64
+
+from ai_vision import analyze_photo_with_ai, openai_client, perceptual_hash
 from database import HistoricalPhoto, SessionLocal
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import create_engine
 
 logger = logging.getLogger(__name__)
 
+# Photos flow through download -> AI analysis stages, each with its own
+# worker threads; the waits are all network (image hosts, OpenAI), so they
+# overlap well. The bounded queues between stages keep downloads from running
+# far ahead of the slower analysis and piling up images.
+CURATION_DOWNLOAD_WORKERS = int(os.getenv("CURATION_DOWNLOAD_WORKERS", "8"))
+CURATION_ANALYSIS_WORKERS = int(os.getenv("CURATION_ANALYSIS_WORKERS", "4"))
+DOWNLOAD_QUEUE_SIZE = 64
+ANALYSIS_QUEUE_SIZE = 16
+DOWNLOAD_TIMEOUT_SECONDS = 30
+
+# Downloads are streamed and abandoned as soon as they are too large, by
+# Content-Length, bytes received, or the pixel count in the image header
+# (read from the first chunk when it is there)
+MAX_DOWNLOAD_BYTES = 20 * 1024 * 1024
+MAX_IMAGE_PIXELS = 50_000_000
+DOWNLOAD_CHUNK_BYTES = 64 * 1024
+
+# Downloaded JPEGs are decoded at a reduced scale (libjpeg DCT scaling),
+# never below DECODE_MIN_DIMENSION, then capped at the size we store, so
+# oversized scans cost a fraction of the decode
+DECODE_MIN_DIMENSION = 1024
+CURATED_IMAGE_MAX_DIMENSION = 1600
+
+# Each photo is JPEG-encoded once (or not at all, when the download already
+# is a small enough RGB JPEG); the same bytes go to the Vision API and to disk.
+# Quality 85 with optimized Huffman tables and progressive scans is visually
+# indistinguishable from 95 at well under half the size.
+CURATED_JPEG_QUALITY = 85
+
+# Each image host is limited independently: at most this many requests in
+# flight, started no faster than one per interval
+HOST_MAX_CONCURRENT_REQUESTS = 2
+HOST_REQUEST_INTERVAL_SECONDS = 0.5
+
+# One HTTP/2 client per cycle for searches and downloads, so repeated calls
+# to a source reuse warm connections instead of a new TCP + TLS handshake
+CURATION_HTTP_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=16)
+
+# Downloaded photos whose perceptual hash is within this many bits of one
+# already curated (this cycle or any before) are skipped before the AI call
+PHASH_MAX_DISTANCE = 6
+PHASH_BITS = 64
+
+# Chicago landmark coordinates (lat, lon), keyed by casefolded name
+LANDMARK_COORDS = {
+    "chicago theater": (41.8781, -87.6278),
+    "state street": (41.8781, -87.6278),
+    "loop district": (41.8796, -87.6237),
+    "michigan avenue": (41.8819, -87.6278),
+    "navy pier": (41.8917, -87.6086),
+    "grant park": (41.8758, -87.6189),
+    "millennium park": (41.8826, -87.6226),
+    "wrigley field": (41.9484, -87.6553),
+    "union station": (41.8789, -87.6406),
+    "willis tower": (41.8789, -87.6359),
+    "sears tower": (41.8789, -87.6359)
+}
+
+# Neighborhoods, checked in order against the AI's neighborhood text
+NEIGHBORHOOD_COORDS = (
+    ("loop", (41.8796, -87.6237)),
+    ("downtown", (41.8781, -87.6278)),
+    ("gold coast", (41.9031, -87.6275)),
+    ("lincoln park", (41.9212, -87.6341)),
+    ("wrigleyville", (41.9484, -87.6553))
+)
+
+# Every assessed URL is remembered for a week with its HTTP validators and
+# verdict: rediscovered photos are re-downloaded only if they changed (a
+# conditional GET answered 304 costs no body) and never re-assessed otherwise.
+# Shared through Redis when configured, otherwise a small in-process LRU.
+REDIS_URL = os.getenv("REDIS_URL")
+SEEN_URL_CACHE_PREFIX = "stm:curation:url:"
+SEEN_URL_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
+LOCAL_SEEN_URL_CACHE_SIZE = 4096
+
+seen_url_redis = redis.Redis.from_url(REDIS_URL) if redis and REDIS_URL else None
+_local_seen_urls: "OrderedDict[str, str]" = OrderedDict()
+_local_seen_urls_lock = threading.Lock()
+
+# URLs that got a verdict but offer no HTTP validators (nothing to
+# revalidate) also go into a Bloom filter on disk (about 2.4 MB for a
+# million URLs at a 1e-4 false-positive rate), so discovery drops them for
+# good before they take a slot in the cycle. URLs with an ETag or
+# Last-Modified stay out of it and are revalidated through the cache above.
+# A false positive only means skipping one new photo.
+SEEN_URL_FILTER_PATH = os.getenv("SEEN_URL_FILTER_PATH", "seen_urls.bloom")
+SEEN_URL_FILTER_CAPACITY = 1_000_000
+SEEN_URL_FILTER_ERROR_RATE = 1e-4
+
+# Approved photos are written here (relative to the working directory)
+CURATED_IMAGES_DIR = "static_historical"
+
+# Up to this many downloaded photos share one Vision request (a multi-image
+# prompt answered with a JSON array), sized to stay well under token limits
+QUALITY_BATCH_SIZE = int(os.getenv("QUALITY_BATCH_SIZE", "8"))
+QUALITY_MAX_TOKENS_PER_PHOTO = 400
+
+QUALITY_ASSESSMENT_CRITERIA = """Please assess:
+
+1. **Chicago Relevance** (0-100): Is this clearly a Chicago location? Look for:
+   - Recognizable Chicago landmarks
+   - Chicago-style architecture
+   - Geographic features (Lake Michigan, Chicago River)
+   - Street signs or text indicating Chicago
+
+2. **Historical Value** (0-100): Historical significance and interest level
+
+3. **Image Quality** (0-100): Technical quality, clarity, composition
+
+4. **Time Period**: What decade/year does this appear to be from?
+
+5. **Location Details**: 
+   - Specific landmarks visible
+   - Approximate neighborhood/area
+   - Viewing direction if determinable
+
+6. **APPROVAL DECISION**: Should this photo be added to the database?
+   - Minimum requirements: Chicago relevance >70, Quality >50, Historical value >60"""
+
+QUALITY_ASSESSMENT_FORMAT = """{
+    "chicago_relevance": 85,
+    "historical_value": 75,
+    "image_quality": 80,
+    "estimated_year": 1945,
+    "landmarks": ["Chicago Theater", "State Street"],
+    "neighborhood": "Loop District",
+    "viewing_direction": "North",
+    "approved": true,
+    "rejection_reason": null,
+    "title": "Improved title based on analysis",
+    "description": "Detailed description of what's shown"
+}"""
+
+# Prompts rendered once at import; only the per-photo fields are substituted
+# per request (Template, since the JSON example is full of braces)
+QUALITY_ASSESSMENT_PROMPT = Template("""Analyze this historical photograph and determine if it should be included in a Chicago historical photo database. 
+
+Photo metadata:
+- Title: $title
+- Source: $source
+- Estimated date: $date_estimate
+
+""" + QUALITY_ASSESSMENT_CRITERIA + """
+
+Respond in JSON format:
+""" + QUALITY_ASSESSMENT_FORMAT + "\n")
+
+QUALITY_ASSESSMENT_BATCH_PROMPT = Template("""Analyze each of these $count historical photographs and determine if it should be included in a Chicago historical photo database. 
+
+Photo metadata, in the order the images are attached:
+$photo_lines
+
+For each photo, """ + QUALITY_ASSESSMENT_CRITERIA[0].lower() + QUALITY_ASSESSMENT_CRITERIA[1:] + """
+
+Respond with a JSON array with one object per image, in order, each in this format:
+""" + QUALITY_ASSESSMENT_FORMAT + "\n")
+
+class RateLimiter:
+    """
+    Thread-safe token bucket: one token every interval seconds, holding at
+    most burst tokens
+    """
+    
+    def __init__(self, interval: float, burst: int = 1):
+        self.interval = interval
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a token is available and take it"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) / self.interval)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) * self.interval
+            time.sleep(wait)
+
+class UrlBloomFilter:
+    """
+    Thread-safe fixed-size Bloom filter of URLs, persisted as its raw bit array
+    """
+    
+    def __init__(self, path: str, capacity: int = SEEN_URL_FILTER_CAPACITY,
+                 error_rate: float = SEEN_URL_FILTER_ERROR_RATE):
+        self.path = path
+        self.num_bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.lock = threading.Lock()
+        
+        try:
+            with open(path, "rb") as filter_file:
+                saved = filter_file.read()
+            if len(saved) == len(self.bits):
+                self.bits[:] = saved
+            else:
+                logger.warning(f"Ignoring seen-URL filter {path} with a different size")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Could not load seen-URL filter {path}: {e}")
+    
+    def _positions(self, url: str):
+        """Bit positions for a URL, by double hashing one 128-bit digest"""
+        digest = hashlib.blake2b(url.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+    
+    def __contains__(self, url: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(url))
+    
+    def add(self, url: str):
+        positions = self._positions(url)
+        with self.lock:
+            for position in positions:
+                self.bits[position >> 3] |= 1 << (position & 7)
+    
+    def save(self):
+        """Merge into the saved filter (another cycle may have added URLs) and write it atomically"""
+        with self.lock:
+            try:
+                with open(self.path, "rb") as filter_file:
+                    saved = filter_file.read()
+                if len(saved) == len(self.bits):
+                    self.bits[:] = (int.from_bytes(self.bits, "little") | int.from_bytes(saved, "little")).to_bytes(len(self.bits), "little")
+            except FileNotFoundError:
+                pass
+            
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "wb") as filter_file:
+                filter_file.write(self.bits)
+            os.replace(temp_path, self.path)
+
 @dataclass
 class PhotoSource:
     name: str
@@ -56,6 +330,16 @@ PHOTO_SOURCES = [
     )
 ]
 
+# Search method for each PhotoSource, by source name: (curator, source, limit) -> photos
+SOURCE_HANDLERS: Dict[str, Callable] = {}
+
+def register_source(name: str):
+    """Register the decorated AIPhotoCurator method as the search for a source"""
+    def register(search: Callable) -> Callable:
+        SOURCE_HANDLERS[name] = search
+        return search
+    return register
+
 class AIPhotoCurator:
     """
     Main curator class that orchestrates the photo discovery and curation process
@@ -63,10 +347,33 @@ class AIPhotoCurator:
     
     def __init__(self):
         self.db = SessionLocal()
-        self.openai_client = openai
+        self.openai_client = openai_client
         self.discovered_photos = []
         self.processed_count = 0
         self.success_count = 0
+        self.counts_lock = threading.Lock()
+        
+        # Created once here rather than checked before every write
+        self.output_dir = CURATED_IMAGES_DIR
+        os.makedirs(self.output_dir, exist_ok=True)
+        
+        # One connection pool shared by all workers (and the source searches)
+        self.http = httpx.Client(http2=True, limits=CURATION_HTTP_LIMITS, timeout=30, follow_redirects=True)
+        
+        self.host_limits: Dict[str, Tuple[threading.Semaphore, RateLimiter]] = {}
+        self.host_limits_lock = threading.Lock()
+        
+        # Perceptual hashes of every photo already curated or in flight: the
+        # first known_phash_count slots of a uint64 buffer that doubles as needed
+        self.known_phashes = np.empty(0, dtype=np.uint64)
+        self.known_phash_count = 0
+        self.phash_lock = threading.Lock()
+        
+        # URLs assessed in this or any earlier cycle
+        self.seen_url_filter = UrlBloomFilter(SEEN_URL_FILTER_PATH)
+        
+        # Set by stop(): queued photos are drained without further work
+        self.shutdown_event = threading.Event()
         
     def run_curation_cycle(self, max_photos_per_cycle: int = 50):
         """
@@ -81,23 +388,9 @@ class AIPhotoCurator:
             discovered_photos = self.discover_photos(max_photos_per_cycle)
             logger.info(f"Discovered {len(discovered_photos)} candidate photos")
             
-            # Phase 2: AI analysis and filtering
-            curated_photos = []
-            for photo_data in discovered_photos:
-                try:
-                    curated_photo = self.analyze_and_curate_photo(photo_data)
-                    if curated_photo:
-                        curated_photos.append(curated_photo)
-                        self.success_count += 1
-                    
-                    self.processed_count += 1
-                    
-                    # Rate limiting
-                    time.sleep(2)  # Be respectful to APIs
-                    
-                except Exception as e:
-                    logger.error(f"Error processing photo {photo_data.get('url', 'unknown')}: {e}")
-                    continue
+            # Phase 2: AI analysis and filtering, pipelined (the per-host
+            # limits in fetch() keep us respectful to the APIs)
+            curated_photos = self.curate_photos(discovered_photos)
             
             # Phase 3: Store approved photos
             stored_count = self.store_curated_photos(curated_photos)
@@ -117,41 +410,190 @@ class AIPhotoCurator:
             logger.error(f"Curation cycle failed: {e}")
             return {"error": str(e)}
         finally:
+            try:
+                self.seen_url_filter.save()
+            except Exception as e:
+                logger.warning(f"Could not save seen-URL filter: {e}")
+            self.http.close()
             self.db.close()
     
-    def discover_photos(self, max_photos: int) -> List[Dict]:
+    def stop(self):
+        """Ask a running cycle to finish early; photos not yet processed are skipped"""
+        self.shutdown_event.set()
+    
+    def curate_photos(self, discovered_photos: List[Dict]) -> List[Dict]:
         """
-        Discover photos from multiple sources using various APIs and web scraping
+        Run the photos through the download and analysis stages; returns the
+        approved ones in discovery order
         """
-        all_photos = []
-        photos_per_source = max_photos // len(PHOTO_SOURCES)
+        self.load_known_phashes()
         
-        for source in PHOTO_SOURCES:
-            try:
-                logger.info(f"Searching {source.name} for historical Chicago photos")
+        download_queue = queue.Queue(maxsize=DOWNLOAD_QUEUE_SIZE)
+        analysis_queue = queue.Queue(maxsize=ANALYSIS_QUEUE_SIZE)
+        results: List[Optional[Dict]] = [None] * len(discovered_photos)
+        
+        def download_worker():
+            while (item := download_queue.get()) is not None:
+                index, photo_data = item
+                jpeg_bytes = None
+                if not self.shutdown_event.is_set():
+                    jpeg_bytes = self.download_photo(photo_data)
+                analysis_queue.put((index, photo_data, jpeg_bytes))
+        
+        def analysis_worker():
+            finished = False
+            while not finished:
+                # Whatever is already waiting (up to a batch) is assessed together
+                batch = []
+                while len(batch) < QUALITY_BATCH_SIZE:
+                    try:
+                        item = analysis_queue.get(block=not batch)
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        finished = True
+                        break
+                    batch.append(item)
+                
+                if self.shutdown_event.is_set() or not batch:
+                    continue
+                
+                downloaded = [(index, photo_data, jpeg_bytes) for index, photo_data, jpeg_bytes in batch if jpeg_bytes]
+                assessments = self.ai_quality_assessment_batch(
+                    [(jpeg_bytes, photo_data) for _, photo_data, jpeg_bytes in downloaded]
+                ) if downloaded else []
+                
+                for (index, photo_data, jpeg_bytes), ai_analysis in zip(downloaded, assessments):
+                    try:
+                        results[index] = self.curate_downloaded_photo(photo_data, jpeg_bytes, ai_analysis)
+                    except Exception as e:
+                        logger.error(f"Error processing photo {photo_data.get('url', 'unknown')}: {e}")
+                
+                with self.counts_lock:
+                    self.processed_count += len(batch)
+                    self.success_count += sum(1 for index, _, _ in downloaded if results[index])
+        
+        downloaders = [
+            threading.Thread(target=download_worker, name=f"curation-download-{i}", daemon=True)
+            for i in range(CURATION_DOWNLOAD_WORKERS)
+        ]
+        analyzers = [
+            threading.Thread(target=analysis_worker, name=f"curation-analysis-{i}", daemon=True)
+            for i in range(CURATION_ANALYSIS_WORKERS)
+        ]
+        for worker in downloaders + analyzers:
+            worker.start()
+        
+        # Feed the first stage, then shut each stage down once the one
+        # before it has finished (one sentinel per worker)
+        for item in enumerate(discovered_photos):
+            download_queue.put(item)
+        for _ in downloaders:
+            download_queue.put(None)
+        for worker in downloaders:
+            worker.join()
+        for _ in analyzers:
+            analysis_queue.put(None)
+        for worker in analyzers:
+            worker.join()
+        
+        return [photo for photo in results if photo]
+    
+    def limits_for(self, url: str) -> Tuple[threading.Semaphore, RateLimiter]:
+        """The concurrency and rate limits of a URL's host"""
+        host = urlparse(url).netloc
+        with self.host_limits_lock:
+            if host not in self.host_limits:
+                self.host_limits[host] = (
+                    threading.Semaphore(HOST_MAX_CONCURRENT_REQUESTS),
+                    RateLimiter(HOST_REQUEST_INTERVAL_SECONDS)
+                )
+            return self.host_limits[host]
+    
+    def fetch(self, url: str, **kwargs) -> httpx.Response:
+        """
+        GET through the shared client, within the per-host concurrency and
+        rate limits
+        """
+        semaphore, limiter = self.limits_for(url)
+        with semaphore:
+            limiter.acquire()
+            return self.http.get(url, **kwargs)
+    
+    def fetch_image(self, url: str, headers: Dict) -> Tuple[int, Optional[bytes], Dict]:
+        """
+        Stream an image within the per-host limits; returns (status, body,
+        headers), with no body unless it is a 200 within our size limits
+        """
+        semaphore, limiter = self.limits_for(url)
+        with semaphore:
+            limiter.acquire()
+            with self.http.stream("GET", url, headers=headers, timeout=DOWNLOAD_TIMEOUT_SECONDS) as response:
+                if response.status_code != 200:
+                    return response.status_code, None, response.headers
+                
+                if int(response.headers.get("Content-Length") or 0) > MAX_DOWNLOAD_BYTES:
+                    logger.info(f"Skipping oversized photo {url} ({response.headers['Content-Length']} bytes)")
+                    return response.status_code, None, response.headers
                 
-                if source.name == "Library of Congress":
-                    photos = self.search_library_of_congress(source, photos_per_source)
-                elif source.name == "Flickr Commons":
-                    photos = self.search_flickr_commons(source, photos_per_source)
-                elif source.name == "Unsplash Historical":
-                    photos = self.search_unsplash(source, photos_per_source)
-                elif source.name == "Wikimedia Commons":
-                    photos = self.search_wikimedia_commons(source, photos_per_source)
-                else:
-                    photos = []
+                chunks = []
+                received = 0
+                for chunk in response.iter_bytes(DOWNLOAD_CHUNK_BYTES):
+                    received += len(chunk)
+                    if received > MAX_DOWNLOAD_BYTES:
+                        logger.info(f"Skipping oversized photo {url} (over {MAX_DOWNLOAD_BYTES} bytes)")
+                        return response.status_code, None, response.headers
+                    
+                    # The dimensions are usually in the first chunk's header
+                    if not chunks and not image_within_pixel_limit(chunk):
+                        logger.info(f"Skipping oversized photo {url} (over {MAX_IMAGE_PIXELS} pixels)")
+                        return response.status_code, None, response.headers
+                    chunks.append(chunk)
                 
+                return response.status_code, b"".join(chunks), response.headers
+    
+    def discover_photos(self, max_photos: int) -> List[Dict]:
+        """
+        Discover photos from multiple sources using various APIs and web scraping.
+        The sources are searched concurrently, so discovery takes as long as
+        the slowest one.
+        """
+        photos_per_source = max_photos // len(PHOTO_SOURCES)
+        
+        with ThreadPoolExecutor(max_workers=len(PHOTO_SOURCES), thread_name_prefix="discovery") as executor:
+            searches = [
+                (source, executor.submit(self.search_source, source, photos_per_source))
+                for source in PHOTO_SOURCES
+            ]
+            # Combined in source order, so deduplication stays deterministic
+            all_photos = []
+            for source, search in searches:
+                photos = search.result()
                 all_photos.extend(photos)
                 logger.info(f"Found {len(photos)} photos from {source.name}")
-                
-            except Exception as e:
-                logger.error(f"Error searching {source.name}: {e}")
-                continue
         
         # Remove duplicates and limit total
         unique_photos = self.deduplicate_photos(all_photos)
         return unique_photos[:max_photos]
     
+    def search_source(self, source: PhotoSource, limit: int) -> List[Dict]:
+        """
+        Search one source with its registered handler; failures return no photos
+        """
+        try:
+            logger.info(f"Searching {source.name} for historical Chicago photos")
+            
+            search = SOURCE_HANDLERS.get(source.name)
+            if search is None:
+                logger.warning(f"No search handler registered for {source.name}")
+                return []
+            return search(self, source, limit)
+            
+        except Exception as e:
+            logger.error(f"Error searching {source.name}: {e}")
+            return []
+    
+    @register_source("Library of Congress")
     def search_library_of_congress(self, source: PhotoSource, limit: int) -> List[Dict]:
         """
         Search Library of Congress digital collections
@@ -183,6 +625,7 @@ class AIPhotoCurator:
         
         return photos
     
+    @register_source("Flickr Commons")
     def search_flickr_commons(self, source: PhotoSource, limit: int) -> List[Dict]:
         """
         Search Flickr Commons for historical photos
@@ -208,7 +651,7 @@ class AIPhotoCurator:
                     "extras": "description,date_taken,tags,geo"
                 }
                 
-                response = requests.get(url, params=params, timeout=30)
+                response = self.fetch(url, params=params, timeout=30)
                 data = response.json()
                 
                 if data.get("stat") == "ok":
@@ -232,6 +675,7 @@ class AIPhotoCurator:
         
         return photos
     
+    @register_source("Wikimedia Commons")
     def search_wikimedia_commons(self, source: PhotoSource, limit: int) -> List[Dict]:
         """
         Search Wikimedia Commons for historical Chicago photos
@@ -251,7 +695,7 @@ class AIPhotoCurator:
                     "srnamespace": 6  # File namespace
                 }
                 
-                response = requests.get(url, params=params, timeout=30)
+                response = self.fetch(url, params=params, timeout=30)
                 data = response.json()
                 
                 for item in data.get("query", {}).get("search", []):
@@ -277,28 +721,85 @@ class AIPhotoCurator:
         
         return photos
     
-    def analyze_and_curate_photo(self, photo_data: Dict) -> Optional[Dict]:
+    def download_photo(self, photo_data: Dict) -> Optional[bytes]:
         """
-        Use AI to analyze a discovered photo and determine if it should be included
+        Download stage: fetch a discovered photo and return it as the JPEG
+        bytes we send to the Vision API and store
         """
         try:
-            # Download the image
-            response = requests.get(photo_data["url"], timeout=30, headers={
+            headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            })
+            }
+            
+            # Already assessed: only worth downloading again if it changed
+            seen = get_seen_url(photo_data["url"])
+            if seen:
+                if not (seen.get("etag") or seen.get("last_modified")):
+                    logger.info(f"Skipping already {seen['verdict']} photo {photo_data['url']}")
+                    return None
+                if seen.get("etag"):
+                    headers["If-None-Match"] = seen["etag"]
+                if seen.get("last_modified"):
+                    headers["If-Modified-Since"] = seen["last_modified"]
+            
+            status, body, response_headers = self.fetch_image(photo_data["url"], headers)
             
-            if response.status_code != 200:
+            if status == 304:
+                logger.info(f"Skipping unchanged, already {seen['verdict']} photo {photo_data['url']}")
+                return None
+            
+            if status != 200:
                 logger.warning(f"Failed to download image from {photo_data['url']}")
                 return None
             
+            if body is None:
+                return None
+            
             # Open with PIL
-            image = Image.open(io.BytesIO(response.content))
+            image = Image.open(io.BytesIO(body))
+            original_format, original_size = image.format, image.size
+            if original_size[0] * original_size[1] > MAX_IMAGE_PIXELS:
+                logger.info(f"Skipping oversized photo {photo_data['url']} ({original_size[0]}x{original_size[1]})")
+                return None
+            image.draft("RGB", (DECODE_MIN_DIMENSION, DECODE_MIN_DIMENSION))
+            image.thumbnail((CURATED_IMAGE_MAX_DIMENSION, CURATED_IMAGE_MAX_DIMENSION), Image.Resampling.LANCZOS)
+            
+            # The same picture is often hosted by several sources
+            phash = int(perceptual_hash(image), 16)
+            photo_data["phash"] = phash
+            photo_data["http_validators"] = {
+                "etag": response_headers.get("ETag"),
+                "last_modified": response_headers.get("Last-Modified")
+            }
+            if not self.claim_phash(phash):
+                logger.info(f"Skipping near-duplicate photo {photo_data['url']}")
+                self.record_verdict(photo_data, "duplicate")
+                return None
+            
+            # A JPEG we didn't need to shrink is used exactly as downloaded
+            if original_format == "JPEG" and image.size == original_size and image.mode in ("RGB", "L"):
+                return optimize_jpeg_bytes(body)
+            return encode_jpeg_bytes(image)
             
+        except Exception as e:
+            logger.error(f"Error downloading photo {photo_data['url']}: {e}")
+            return None
+    
+    def curate_downloaded_photo(self, photo_data: Dict, jpeg_bytes: bytes,
+                                ai_analysis: Optional[Dict] = None) -> Optional[Dict]:
+        """
+        Analysis stage: AI assessment (unless already done in a batch),
+        location, and saving the approved image
+        """
+        try:
             # AI Analysis
-            ai_analysis = self.ai_quality_assessment(image, photo_data)
+            if ai_analysis is None:
+                ai_analysis = self.ai_quality_assessment(jpeg_bytes, photo_data)
             
             if not ai_analysis["approved"]:
                 logger.info(f"Photo rejected: {ai_analysis['rejection_reason']}")
+                if not ai_analysis.get("assessment_failed"):
+                    self.record_verdict(photo_data, "rejected")
                 return None
             
             # Extract location and metadata
@@ -310,11 +811,11 @@ class AIPhotoCurator:
             
             # Generate filename and save image
             filename = self.generate_filename(photo_data, ai_analysis)
-            image_path = os.path.join("static_historical", filename)
+            image_path = os.path.join(self.output_dir, filename)
             
-            # Save image
-            os.makedirs("static_historical", exist_ok=True)
-            image.save(image_path, "JPEG", quality=95)
+            # Save image (already encoded)
+            with open(image_path, "wb") as image_file:
+                image_file.write(jpeg_bytes)
             
             # Prepare database record
             curated_photo = {
@@ -328,68 +829,31 @@ class AIPhotoCurator:
                 "ai_analysis": ai_analysis,
                 "landmarks": ai_analysis.get("landmarks", []),
                 "quality_score": ai_analysis.get("quality_score", 0.7),
-                "historical_interest_score": ai_analysis.get("historical_interest", 0.7)
+                "historical_interest_score": ai_analysis.get("historical_interest", 0.7),
+                "phash": photo_data.get("phash")
             }
             
+            self.record_verdict(photo_data, "approved")
             return curated_photo
             
         except Exception as e:
             logger.error(f"Error analyzing photo {photo_data['url']}: {e}")
             return None
     
-    def ai_quality_assessment(self, image: Image.Image, photo_data: Dict) -> Dict:
+    def ai_quality_assessment(self, jpeg_bytes: bytes, photo_data: Dict) -> Dict:
         """
         Use OpenAI Vision to assess photo quality and relevance
         """
         try:
-            base64_image = encode_image_to_base64(image)
+            image_data_uri = jpeg_data_uri(jpeg_bytes)
             
-            prompt = f"""Analyze this historical photograph and determine if it should be included in a Chicago historical photo database. 
-
-Photo metadata:
-- Title: {photo_data.get('title', 'Unknown')}
-- Source: {photo_data.get('source', 'Unknown')}
-- Estimated date: {photo_data.get('date_estimate', 'Unknown')}
-
-Please assess:
-
-1. **Chicago Relevance** (0-100): Is this clearly a Chicago location? Look for:
-   - Recognizable Chicago landmarks
-   - Chicago-style architecture
-   - Geographic features (Lake Michigan, Chicago River)
-   - Street signs or text indicating Chicago
-
-2. **Historical Value** (0-100): Historical significance and interest level
-
-3. **Image Quality** (0-100): Technical quality, clarity, composition
-
-4. **Time Period**: What decade/year does this appear to be from?
-
-5. **Location Details**: 
-   - Specific landmarks visible
-   - Approximate neighborhood/area
-   - Viewing direction if determinable
-
-6. **APPROVAL DECISION**: Should this photo be added to the database?
-   - Minimum requirements: Chicago relevance >70, Quality >50, Historical value >60
-
-Respond in JSON format:
-{{
-    "chicago_relevance": 85,
-    "historical_value": 75,
-    "image_quality": 80,
-    "estimated_year": 1945,
-    "landmarks": ["Chicago Theater", "State Street"],
-    "neighborhood": "Loop District",
-    "viewing_direction": "North",
-    "approved": true,
-    "rejection_reason": null,
-    "title": "Improved title based on analysis",
-    "description": "Detailed description of what's shown"
-}}
-"""
-
-            response = openai.chat.completions.create(
+            prompt = QUALITY_ASSESSMENT_PROMPT.substitute(
+                title=photo_data.get('title', 'Unknown'),
+                source=photo_data.get('source', 'Unknown'),
+                date_estimate=photo_data.get('date_estimate', 'Unknown')
+            )
+            
+            response = self.openai_client.chat.completions.create(
                 model="gpt-4-vision-preview",
                 messages=[
                     {
@@ -399,7 +863,7 @@ Respond in JSON format:
                             {
                                 "type": "image_url",
                                 "image_url": {
-                                    "url": f"data:image/jpeg;base64,{base64_image}",
+                                    "url": image_data_uri,
                                     "detail": "high"
                                 }
                             }
@@ -410,91 +874,157 @@ Respond in JSON format:
                 temperature=0.1
             )
             
-            # Parse JSON response
-            analysis_text = response.choices[0].message.content
-            
-            # Clean up the response to extract JSON
-            if "```json" in analysis_text:
-                json_str = analysis_text.split("```json")[1].split("```")[0]
-            else:
-                json_str = analysis_text
-            
-            analysis = json.loads(json_str)
-            
-            # Apply approval logic
-            chicago_rel = analysis.get("chicago_relevance", 0)
-            quality = analysis.get("image_quality", 0) 
-            historical = analysis.get("historical_value", 0)
-            
-            analysis["approved"] = (
-                chicago_rel >= 70 and 
-                quality >= 50 and 
-                historical >= 60
-            )
-            
-            if not analysis["approved"]:
-                analysis["rejection_reason"] = f"Scores: Chicago {chicago_rel}, Quality {quality}, Historical {historical}"
-            
-            return analysis
+            analysis = self.parse_json_response(response.choices[0].message.content)
+            return self.apply_approval(analysis)
             
         except Exception as e:
             logger.error(f"AI quality assessment failed: {e}")
             return {
                 "approved": False,
                 "rejection_reason": f"AI analysis failed: {str(e)}",
+                "assessment_failed": True,
                 "chicago_relevance": 0,
                 "historical_value": 0,
                 "image_quality": 0
             }
     
+    def ai_quality_assessment_batch(self, photos: List[Tuple[bytes, Dict]]) -> List[Dict]:
+        """
+        Assess several photos with one Vision request; the model returns one
+        verdict per image, in order. Falls back to one request per photo if
+        the batch fails or the verdicts don't line up.
+        """
+        if len(photos) == 1:
+            jpeg_bytes, photo_data = photos[0]
+            return [self.ai_quality_assessment(jpeg_bytes, photo_data)]
+        
+        try:
+            photo_lines = "\n".join(
+                f"- Image {number}: Title: {photo_data.get('title', 'Unknown')}; "
+                f"Source: {photo_data.get('source', 'Unknown')}; "
+                f"Estimated date: {photo_data.get('date_estimate', 'Unknown')}"
+                for number, (_, photo_data) in enumerate(photos, start=1)
+            )
+            
+            prompt = QUALITY_ASSESSMENT_BATCH_PROMPT.substitute(count=len(photos), photo_lines=photo_lines)
+            
+            content = [{"type": "text", "text": prompt}]
+            content.extend(
+                {
+                    "type": "image_url",
+                    "image_url": {
+                        "url": jpeg_data_uri(jpeg_bytes),
+                        "detail": "high"
+                    }
+                }
+                for jpeg_bytes, _ in photos
+            )
+            
+            response = self.openai_client.chat.completions.create(
+                model="gpt-4-vision-preview",
+                messages=[{"role": "user", "content": content}],
+                max_tokens=QUALITY_MAX_TOKENS_PER_PHOTO * len(photos),
+                temperature=0.1
+            )
+            
+            analyses = self.parse_json_response(response.choices[0].message.content)
+            if (not isinstance(analyses, list) or len(analyses) != len(photos)
+                    or not all(isinstance(analysis, dict) for analysis in analyses)):
+                raise ValueError(f"expected a JSON array of {len(photos)} verdicts")
+            
+            return [self.apply_approval(analysis) for analysis in analyses]
+            
+        except Exception as e:
+            logger.warning(f"Batched AI quality assessment failed, assessing photos one at a time: {e}")
+            return [self.ai_quality_assessment(jpeg_bytes, photo_data) for jpeg_bytes, photo_data in photos]
+    
+    def parse_json_response(self, analysis_text: str):
+        """
+        Parse the JSON in a Vision response, which may be wrapped in a code fence
+        """
+        # Clean up the response to extract JSON
+        if "```json" in analysis_text:
+            json_str = analysis_text.split("```json")[1].split("```")[0]
+        else:
+            json_str = analysis_text
+        
+        return (orjson or json).loads(json_str)
+    
+    def apply_approval(self, analysis: Dict) -> Dict:
+        """
+        Apply our approval thresholds to the model's scores
+        """
+        chicago_rel = analysis.get("chicago_relevance", 0)
+        quality = analysis.get("image_quality", 0) 
+        historical = analysis.get("historical_value", 0)
+        
+        analysis["approved"] = (
+            chicago_rel >= 70 and 
+            quality >= 50 and 
+            historical >= 60
+        )
+        
+        if not analysis["approved"]:
+            analysis["rejection_reason"] = f"Scores: Chicago {chicago_rel}, Quality {quality}, Historical {historical}"
+        
+        return analysis
+    
+    def load_known_phashes(self):
+        """
+        Start the near-duplicate check from the hashes of photos already stored
+        """
+        try:
+            rows = self.db.query(HistoricalPhoto.phash).filter(HistoricalPhoto.phash.isnot(None)).all()
+            # Signed BIGINTs reinterpret as the unsigned hashes bit for bit
+            self.known_phashes = np.array([row.phash for row in rows], dtype=np.int64).view(np.uint64)
+        except Exception as e:
+            logger.warning(f"Could not load stored perceptual hashes: {e}")
+            self.db.rollback()
+            self.known_phashes = np.empty(0, dtype=np.uint64)
+        self.known_phash_count = len(self.known_phashes)
+    
+    def claim_phash(self, phash: int) -> bool:
+        """
+        Record a downloaded photo's hash; False if it is a near-duplicate of
+        one already seen
+        """
+        with self.phash_lock:
+            known = self.known_phashes[:self.known_phash_count]
+            if (hamming_distances(known, phash) <= PHASH_MAX_DISTANCE).any():
+                return False
+            
+            if self.known_phash_count == len(self.known_phashes):
+                grown = np.empty(max(64, 2 * len(self.known_phashes)), dtype=np.uint64)
+                grown[:self.known_phash_count] = known
+                self.known_phashes = grown
+            self.known_phashes[self.known_phash_count] = phash
+            self.known_phash_count += 1
+            return True
+    
     def extract_location_from_ai_analysis(self, ai_analysis: Dict) -> Optional[Dict]:
         """
         Extract GPS coordinates from AI analysis of landmarks
         """
         landmarks = ai_analysis.get("landmarks", [])
-        neighborhood = ai_analysis.get("neighborhood", "").lower()
-        
-        # Chicago landmark coordinates
-        landmark_coords = {
-            "chicago theater": {"lat": 41.8781, "lon": -87.6278},
-            "state street": {"lat": 41.8781, "lon": -87.6278},
-            "loop district": {"lat": 41.8796, "lon": -87.6237},
-            "michigan avenue": {"lat": 41.8819, "lon": -87.6278},
-            "navy pier": {"lat": 41.8917, "lon": -87.6086},
-            "grant park": {"lat": 41.8758, "lon": -87.6189},
-            "millennium park": {"lat": 41.8826, "lon": -87.6226},
-            "wrigley field": {"lat": 41.9484, "lon": -87.6553},
-            "union station": {"lat": 41.8789, "lon": -87.6406},
-            "willis tower": {"lat": 41.8789, "lon": -87.6359},
-            "sears tower": {"lat": 41.8789, "lon": -87.6359}
-        }
+        neighborhood = (ai_analysis.get("neighborhood") or "").casefold()
         
         # Try to match landmarks
         for landmark in landmarks:
-            landmark_key = landmark.lower()
-            if landmark_key in landmark_coords:
-                coords = landmark_coords[landmark_key]
+            coords = LANDMARK_COORDS.get(landmark.casefold())
+            if coords:
                 return {
-                    "latitude": coords["lat"],
-                    "longitude": coords["lon"],
+                    "latitude": coords[0],
+                    "longitude": coords[1],
                     "source": f"landmark_{landmark}",
                     "accuracy": 200
                 }
         
-        # Try neighborhood matching
-        neighborhood_coords = {
-            "loop": {"lat": 41.8796, "lon": -87.6237},
-            "downtown": {"lat": 41.8781, "lon": -87.6278},
-            "gold coast": {"lat": 41.9031, "lon": -87.6275},
-            "lincoln park": {"lat": 41.9212, "lon": -87.6341},
-            "wrigleyville": {"lat": 41.9484, "lon": -87.6553}
-        }
-        
-        for neighborhood_name, coords in neighborhood_coords.items():
+        # Try neighborhood matching (names may span words, e.g. "gold coast")
+        for neighborhood_name, coords in NEIGHBORHOOD_COORDS:
             if neighborhood_name in neighborhood:
                 return {
-                    "latitude": coords["lat"],
-                    "longitude": coords["lon"],
+                    "latitude": coords[0],
+                    "longitude": coords[1],
                     "source": f"neighborhood_{neighborhood_name}",
                     "accuracy": 500
                 }
@@ -524,77 +1054,114 @@ Respond in JSON format:
             base = "chicago_street"
         
         # Create hash for uniqueness
-        url_hash = hashlib.md5(photo_data["url"].encode()).hexdigest()[:8]
+        url_hash = url_digest(photo_data["url"])[:8]
         
         filename = f"{base}_{year}_{url_hash}.jpg"
         return filename
     
     def store_curated_photos(self, curated_photos: List[Dict]) -> int:
         """
-        Store approved photos in the database
+        Store approved photos in the database: one lookup for the ones we
+        already have, then a single batch insert and commit
         """
-        stored_count = 0
+        if not curated_photos:
+            return 0
         
-        for photo_data in curated_photos:
-            try:
-                # Check if photo already exists (by filename or URL)
-                existing = self.db.query(HistoricalPhoto).filter(
-                    (HistoricalPhoto.filename == photo_data["filename"]) |
-                    (HistoricalPhoto.source_url == photo_data["original_url"])
-                ).first()
-                
-                if existing:
+        try:
+            # Check which photos already exist (by filename or URL)
+            filenames = [photo_data["filename"] for photo_data in curated_photos]
+            urls = [photo_data["original_url"] for photo_data in curated_photos]
+            existing_filenames = set()
+            existing_urls = set()
+            for filename, source_url in self.db.query(HistoricalPhoto.filename, HistoricalPhoto.source_url).filter(
+                HistoricalPhoto.filename.in_(filenames) | HistoricalPhoto.source_url.in_(urls)
+            ):
+                existing_filenames.add(filename)
+                existing_urls.add(source_url)
+            
+            new_photos = []
+            for photo_data in curated_photos:
+                if photo_data["filename"] in existing_filenames or photo_data["original_url"] in existing_urls:
                     logger.info(f"Photo already exists: {photo_data['filename']}")
                     continue
+                # Also guards against duplicates within this batch
+                existing_filenames.add(photo_data["filename"])
+                existing_urls.add(photo_data["original_url"])
                 
-                # Create database record
-                location = photo_data["location"]
-                
-                db_photo = HistoricalPhoto(
-                    filename=photo_data["filename"],
-                    title=photo_data["title"],
-                    description=photo_data["description"],
-                    year=photo_data["year"],
-                    decade=(photo_data["year"] // 10) * 10,
-                    source=photo_data["source"],
-                    source_url=photo_data["original_url"],
-                    location=f"POINT({location['longitude']} {location['latitude']})",
-                    landmarks=json.dumps(photo_data["landmarks"]),
-                    image_quality_score=photo_data["quality_score"],
-                    historical_interest_score=photo_data["historical_interest_score"],
-                    ai_analysis_data=json.dumps(photo_data["ai_analysis"]),
-                    auto_curated=True,
-                    curation_date=datetime.utcnow()
-                )
-                
-                self.db.add(db_photo)
-                self.db.commit()
-                stored_count += 1
-                
-                logger.info(f"Stored photo: {photo_data['title']} ({photo_data['year']})")
-                
-            except Exception as e:
-                logger.error(f"Error storing photo {photo_data['filename']}: {e}")
-                self.db.rollback()
-                continue
+                # Create database record (a malformed one is skipped, not the batch)
+                try:
+                    location = photo_data["location"]
+                    
+                    new_photos.append(HistoricalPhoto(
+                        filename=photo_data["filename"],
+                        title=photo_data["title"],
+                        description=photo_data["description"],
+                        year=photo_data["year"],
+                        decade=(photo_data["year"] // 10) * 10,
+                        source=photo_data["source"],
+                        source_url=photo_data["original_url"],
+                        latitude=location["latitude"],
+                        longitude=location["longitude"],
+                        location_accuracy=location["accuracy"],
+                        location_source=location["source"],
+                        landmarks=photo_data["landmarks"],
+                        image_quality_score=photo_data["quality_score"],
+                        historical_interest_score=photo_data["historical_interest_score"],
+                        ai_analysis_data=photo_data["ai_analysis"],
+                        phash=phash_to_signed(photo_data["phash"]) if photo_data.get("phash") is not None else None,
+                        auto_curated=True,
+                        curation_date=datetime.utcnow()
+                    ))
+                except Exception as e:
+                    logger.error(f"Error preparing photo {photo_data['filename']}: {e}")
+                    continue
+            
+            self.db.add_all(new_photos)
+            self.db.commit()
+            
+        except Exception as e:
+            logger.error(f"Error storing {len(curated_photos)} curated photos: {e}")
+            self.db.rollback()
+            return 0
         
-        return stored_count
+        for photo in new_photos:
+            logger.info(f"Stored photo: {photo.title} ({photo.year})")
+        return len(new_photos)
     
     def deduplicate_photos(self, photos: List[Dict]) -> List[Dict]:
         """
-        Remove duplicate photos based on URL and content similarity
+        Remove duplicate photos based on URL (within this batch and every
+        validator-less URL assessed before); near-identical content is caught
+        after download
         """
         seen_urls = set()
         unique_photos = []
+        already_assessed = 0
         
         for photo in photos:
             url = photo["url"]
-            if url not in seen_urls:
-                seen_urls.add(url)
-                unique_photos.append(photo)
+            if url in seen_urls:
+                continue
+            seen_urls.add(url)
+            if url in self.seen_url_filter:
+                already_assessed += 1
+                continue
+            unique_photos.append(photo)
         
+        if already_assessed:
+            logger.info(f"Skipped {already_assessed} photos assessed in earlier cycles")
         return unique_photos
     
+    def record_verdict(self, photo_data: Dict, verdict: str):
+        """
+        Remember a downloaded photo's verdict, so later cycles skip its URL
+        (or only re-download it if it changed, when it has validators)
+        """
+        remember_seen_url(photo_data, verdict)
+        validators = photo_data.get("http_validators", {})
+        if not (validators.get("etag") or validators.get("last_modified")):
+            self.seen_url_filter.add(photo_data["url"])
+    
     def log_curation_results(self, stored_count: int, duration: timedelta):
         """
         Log the results of the curation cycle
@@ -607,6 +1174,127 @@ Respond in JSON format:
         - Success rate: {(self.success_count/max(self.processed_count, 1)*100):.1f}%
         """)
 
+def url_digest(url: str) -> str:
+    """64-bit digest of a URL as 16 hex digits; only needs to be unique, not secure"""
+    if xxhash is not None:
+        return xxhash.xxh3_64_hexdigest(url.encode())
+    return hashlib.blake2b(url.encode(), digest_size=8).hexdigest()
+
+def image_within_pixel_limit(header: bytes) -> bool:
+    """
+    Check the dimensions in the start of an image file against
+    MAX_IMAGE_PIXELS; True when they can't be read from it yet
+    """
+    try:
+        width, height = Image.open(io.BytesIO(header)).size
+    except Image.DecompressionBombError:
+        return False
+    except Exception:
+        return True
+    return width * height <= MAX_IMAGE_PIXELS
+
+def encode_jpeg_bytes(image: Image.Image, quality: int = CURATED_JPEG_QUALITY) -> bytes:
+    """Encode an image as JPEG once, for both the Vision API and storage"""
+    if image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    with io.BytesIO() as buffer:
+        image.save(buffer, format="JPEG", quality=quality, optimize=True, progressive=True)
+        return optimize_jpeg_bytes(buffer.getvalue())
+
+def optimize_jpeg_bytes(jpeg_bytes: bytes) -> bytes:
+    """Losslessly shrink a JPEG with mozjpeg when it is installed"""
+    if mozjpeg_lossless_optimization is None:
+        return jpeg_bytes
+    try:
+        return mozjpeg_lossless_optimization.optimize(jpeg_bytes)
+    except Exception as e:
+        logger.warning(f"mozjpeg optimization failed: {e}")
+        return jpeg_bytes
+
+def recompress_stored_photos(directory: str = CURATED_IMAGES_DIR) -> int:
+    """
+    Re-encode stored JPEGs with the current settings, keeping each new file
+    only if it is smaller; returns the bytes reclaimed
+    """
+    reclaimed = 0
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if not name.lower().endswith((".jpg", ".jpeg")) or not os.path.isfile(path):
+            continue
+        try:
+            with open(path, "rb") as image_file:
+                original = image_file.read()
+            with Image.open(io.BytesIO(original)) as image:
+                recompressed = encode_jpeg_bytes(image)
+            if len(recompressed) < len(original):
+                with open(path, "wb") as image_file:
+                    image_file.write(recompressed)
+                reclaimed += len(original) - len(recompressed)
+        except Exception as e:
+            logger.error(f"Error recompressing {path}: {e}")
+    
+    logger.info(f"Recompressed stored photos in {directory}, reclaimed {reclaimed} bytes")
+    return reclaimed
+
+def jpeg_data_uri(jpeg_bytes: bytes) -> str:
+    """Base64 data URI for already-encoded JPEG bytes"""
+    return "data:image/jpeg;base64," + base64.b64encode(jpeg_bytes).decode("ascii")
+
+def get_seen_url(url: str) -> Optional[Dict]:
+    """Look up what we know about an already assessed URL; cache failures count as misses"""
+    key = SEEN_URL_CACHE_PREFIX + url_digest(url)
+    try:
+        if seen_url_redis is not None:
+            cached = seen_url_redis.get(key)
+        else:
+            with _local_seen_urls_lock:
+                cached = _local_seen_urls.get(key)
+                if cached is not None:
+                    _local_seen_urls.move_to_end(key)
+    except Exception as e:
+        logger.warning(f"Seen-URL cache read failed: {e}")
+        return None
+    return (orjson or json).loads(cached) if cached else None
+
+def remember_seen_url(photo_data: Dict, verdict: str):
+    """Remember a downloaded photo's validators, hash and verdict ("approved", "rejected" or "duplicate")"""
+    validators = photo_data.get("http_validators", {})
+    phash = photo_data.get("phash")
+    entry = {
+        "etag": validators.get("etag"),
+        "last_modified": validators.get("last_modified"),
+        "phash": f"{phash:016x}" if phash is not None else None,
+        "verdict": verdict
+    }
+    key = SEEN_URL_CACHE_PREFIX + url_digest(photo_data["url"])
+    payload = orjson.dumps(entry) if orjson else json.dumps(entry)
+    try:
+        if seen_url_redis is not None:
+            seen_url_redis.set(key, payload, ex=SEEN_URL_CACHE_TTL_SECONDS)
+        else:
+            with _local_seen_urls_lock:
+                _local_seen_urls[key] = payload
+                _local_seen_urls.move_to_end(key)
+                while len(_local_seen_urls) > LOCAL_SEEN_URL_CACHE_SIZE:
+                    _local_seen_urls.popitem(last=False)
+    except Exception as e:
+        logger.warning(f"Seen-URL cache write failed: {e}")
+
+def hamming_distances(hashes: np.ndarray, phash: int) -> np.ndarray:
+    """Bits differing between phash and each of a uint64 array of hashes, in one vectorized pass"""
+    differing = hashes ^ np.uint64(phash)
+    if hasattr(np, "bitwise_count"):  # numpy >= 2.0: hardware popcount
+        return np.bitwise_count(differing)
+    return np.unpackbits(differing.view(np.uint8)).reshape(-1, PHASH_BITS).sum(axis=1)
+
+def phash_to_signed(phash: int) -> int:
+    """Unsigned 64-bit hash -> the signed value a BIGINT column can hold"""
+    return phash - (1 << PHASH_BITS) if phash >= 1 << (PHASH_BITS - 1) else phash
+
+def phash_from_signed(value: int) -> int:
+    """Inverse of phash_to_signed"""
+    return value & ((1 << PHASH_BITS) - 1)
+
 # Background task scheduler
 def schedule_curation_cycles():
     """
@@ -621,6 +1309,11 @@ def schedule_curation_cycles():
     return results
 
 if __name__ == "__main__":
+    if sys.argv[1:] == ["--recompress"]:
+        # One-off: bring photos saved with older settings down to size
+        recompress_stored_photos()
+        sys.exit()
+    
     # Manual test run
     curator = AIPhotoCurator()
     results = curator.run_curation_cycle(max_photos_per_cycle=10)
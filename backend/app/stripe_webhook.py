@@ -1,5 +1,11 @@
 # backend/app/stripe_webhook.py
 import os
+import time
+import hashlib
+import hmac
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
 from fastapi import APIRouter, Request, HTTPException
 import stripe
 
@@ -10,6 +16,67 @@ stripe.api_key = stripe_api_key
 
 stripe_webhook_router = APIRouter()
 
+# Checkout URLs are reused for the same (price, email) for ten minutes, well
+# inside Stripe's 24h session expiry, so reloading the pricing page doesn't
+# create a new Session each time. Entries are dropped early once the webhook
+# reports the session completed or expired.
+CHECKOUT_SESSION_CACHE_TTL_SECONDS = 10 * 60
+CHECKOUT_SESSION_CACHE_SIZE = 1024
+CHECKOUT_SESSION_INVALIDATING_EVENTS = ("checkout.session.completed", "checkout.session.expired")
+
+# (price_id, email) -> (expires_at, session_id, checkout_url)
+_checkout_sessions: "OrderedDict[Tuple[str, str], tuple]" = OrderedDict()
+_checkout_sessions_lock = threading.Lock()
+
+def get_cached_checkout_url(key: Tuple[str, str]) -> Optional[str]:
+    """Checkout URL of a still-fresh session for (price_id, email), if any"""
+    with _checkout_sessions_lock:
+        expires_at, _, checkout_url = _checkout_sessions.get(key, (0, None, None))
+        if expires_at < time.monotonic():
+            _checkout_sessions.pop(key, None)
+            return None
+        return checkout_url
+
+def store_checkout_session(key: Tuple[str, str], session_id: str, checkout_url: str):
+    """Remember a new session, evicting the oldest entries beyond CHECKOUT_SESSION_CACHE_SIZE"""
+    with _checkout_sessions_lock:
+        _checkout_sessions[key] = (time.monotonic() + CHECKOUT_SESSION_CACHE_TTL_SECONDS, session_id, checkout_url)
+        _checkout_sessions.move_to_end(key)
+        while len(_checkout_sessions) > CHECKOUT_SESSION_CACHE_SIZE:
+            _checkout_sessions.popitem(last=False)
+
+def forget_checkout_session(session_id: str):
+    """Drop the cached URL of a session that can no longer be used"""
+    with _checkout_sessions_lock:
+        for key, (_, cached_id, _) in list(_checkout_sessions.items()):
+            if cached_id == session_id:
+                del _checkout_sessions[key]
+
+def signature_matches(payload: bytes, sig_header: Optional[str], secret: str) -> bool:
+    """
+    Check the stripe-signature header ("t=<timestamp>,v1=<hex>,...") against
+    HMAC-SHA256(secret, "<timestamp>." + payload), in constant time. A cheap
+    prefilter: junk is rejected before the SDK parses anything.
+    """
+    if not sig_header:
+        return False
+    
+    timestamp = None
+    signatures = []
+    for item in sig_header.split(","):
+        key, _, value = item.strip().partition("=")
+        if key == "t":
+            timestamp = value
+        elif key == "v1":
+            signatures.append(value)
+    if not timestamp or not signatures:
+        return False
+    
+    expected = hmac.new(secret.encode(), timestamp.encode() + b"." + payload, hashlib.sha256).hexdigest().encode()
+    # Any v1 may match (Stripe sends several while a secret is being rolled).
+    # Compared as bytes: compare_digest rejects non-ASCII str with TypeError.
+    return any(hmac.compare_digest(expected, signature.encode()) for signature in signatures)
+
 @stripe_webhook_router.post("/create-checkout-session")
 async def create_checkout_session(request: Request):
     """
@@ -22,6 +89,11 @@ async def create_checkout_session(request: Request):
     if not price_id or not customer_email:
         raise HTTPException(status_code=400, detail="Missing priceId or customer_email")
 
+    key = (price_id, customer_email)
+    checkout_url = get_cached_checkout_url(key)
+    if checkout_url:
+        return {"checkout_url": checkout_url}
+
     try:
         session = stripe.checkout.Session.create(
             success_url=os.environ.get("FRONTEND_ORIGIN", "http://localhost:3000") + "/?session_id={CHECKOUT_SESSION_ID}",
@@ -31,6 +103,7 @@ async def create_checkout_session(request: Request):
             line_items=[{"price": price_id, "quantity": 1}],
             customer_email=customer_email,
         )
+        store_checkout_session(key, session.id, session.url)
         return {"checkout_url": session.url}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -40,6 +113,8 @@ async def stripe_webhook(request: Request):
     payload = await request.body()
     sig_header = request.headers.get("stripe-signature")
     if stripe_webhook_secret:
+        if not signature_matches(payload, sig_header, stripe_webhook_secret):
+            raise HTTPException(status_code=400, detail="Webhook signature verification failed")
         try:
             event = stripe.Webhook.construct_event(payload, sig_header, stripe_webhook_secret)
         except Exception as e:
@@ -52,6 +127,10 @@ async def stripe_webhook(request: Request):
         except:
             raise HTTPException(status_code=400, detail="Invalid payload")
 
+    # A finished or expired session must not be handed out again
+    if event and event["type"] in CHECKOUT_SESSION_INVALIDATING_EVENTS:
+        forget_checkout_session(event["data"]["object"]["id"])
+
     # Process events: invoice.paid, customer.subscription.created, etc.
     # TODO: store subscription data to your DB
     # Example: